@@ -1,4 +1,5 @@
 import json
+import logging
 import os
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
@@ -7,15 +8,22 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from openai.types.chat import ChatCompletionMessageParam
 
+from app.ai.memory.base import MemoryTurn
 from app.ai.tools.common import execute_conversation_with_tools, tools
 from app.ai.tools.sql_tool import get_schema_info
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 preferences_file = json.load(open("preferences.json"))
 preferences = preferences_file["preferences"]
 
-async def agent_response(message: str, message_history: Optional[List[ChatCompletionMessageParam]] = None):
+async def agent_response(
+    message: str,
+    message_history: Optional[List[ChatCompletionMessageParam]] = None,
+    turn: Optional[MemoryTurn] = None
+):
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     schema_info = get_schema_info()
     
@@ -116,7 +124,11 @@ async def agent_response(message: str, message_history: Optional[List[ChatComple
     - **Explanation:** Always present query results in natural language.  
     - **Defaults:** If a required value is missing, use your best guess.  
     - **Progress Logging:** Whenever you create or update a task, project or goal, try to add an entry to the progress_log table.
+    - **Goal Progress:** Log progress toward a goal as a progress_logs entry with `related_goal_id` and the amount in `value`; the goal's `current_value` and its daily and weekly totals are updated automatically, so do not update `current_value` yourself. To answer how a goal is going, use the `get_goal_progress` tool instead of summing progress_logs.
+    - **Batching Writes:** When a request needs several writes, such as updating a task and logging the progress, send them together with the `execute_batch` tool instead of one tool call each. Add `RETURNING task_id` (or the needed column) to a statement and pass `"$0.task_id"` as a value to reuse it in a later statement of the same batch.
     - **Tasks:** When I ask for my tasks, you should always ignore completed tasks, unless I ask for them specifically. If a decide to start a task you can ask for more information so that you can help me.
+    - **Overviews:** To check on my projects, tasks and goals, summarize my progress or find tasks stuck in progress, start with the `get_dashboard` tool instead of exploratory queries, and only query for details it does not cover.
+    - **Task Hierarchies:** To see a task's subtasks or a project's task breakdown, use the `get_task_tree` tool with the `task_id` or `project_id` instead of querying `parent_task_id` level by level. It returns every level at once, indented by depth.
     - **Detailed Reasoning:** For every SQL operation, provide comprehensive reasoning that includes:
       1. What the user is trying to achieve
       2. Which table(s) and field(s) are involved
@@ -232,8 +244,8 @@ async def agent_response(message: str, message_history: Optional[List[ChatComple
 - **Proactivity:** Take initiative in suggesting tasks, offering insights, and keeping me accountable.
 - **Integration:** Combine project management, research, and coaching to provide well-rounded assistance.
 - **Task Creation:** Whenever you need to create a new task, create it on the Database using SQL Tool and also on Todoist using the Create Task on Todoist Tool.
-- **Thinking:** Always think step by step. Consider what steps are needed to complete the task, what tools are needed, and then execute them. For example, given a task name and a request to update, you would fetch all tasks from the database using the query tool, then find the id of the task the user refers to, update the task using the update tool, and finally create a progress log using the insert tool.
-- **Thinking:** If I ask you to create or update a task, I might not provide an exact match for its name, so first fetch all tasks to find the relevant id.
+- **Thinking:** Always think step by step. Consider what steps are needed to complete the task, what tools are needed, and then execute them. For example, given a task name and a request to update, you would find the id of the task the user refers to with the `resolve_entity` tool, then update the task and create a progress log together with the `execute_batch` tool.
+- **Thinking:** If I ask you to create or update a task, project or goal, I might not provide an exact match for its name, so first look up its id with the `resolve_entity` tool instead of fetching the whole table. If several matches score close together, ask me which one I meant.
 - **Handling Errors:** Whenever a tool is not executed successfully, include the full error log in your response.
 - **Final Answer Structure:** After you have completed all your reasoning and tool calls, output your response as a JSON object with exactly two keys:
   - `"content"`: A string containing your final answer for me.
@@ -244,10 +256,15 @@ async def agent_response(message: str, message_history: Optional[List[ChatComple
     
 """
     messages: List[ChatCompletionMessageParam] = [{"role": "system", "content": system_prompt}]
-    print(f"[DH] message_history: {message_history}")
+    logger.debug(
+        "[DH] message_history: %d messages",
+        len(message_history or []),
+        extra={"fields": {"message_history": message_history}}
+    )
     if message_history:
         messages.extend(message_history)
     messages.append({"role": "user", "content": message})
+    turn_start = len(messages)
     
     response = await execute_conversation_with_tools(
         client=client,
@@ -255,4 +272,9 @@ async def agent_response(message: str, message_history: Optional[List[ChatComple
         tools=tools,
         model="o3-mini"
     )
+    if turn is not None:
+        turn.add_tool_messages([
+            msg for msg in messages[turn_start:]
+            if msg["role"] == "tool" or msg.get("tool_calls")
+        ])
     return response
@@ -4,15 +4,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.memory.base import BaseMemory
 from app.ai.memory.local_memory import LocalMemory
+from app.ai.memory.redis_memory import RedisMemory
 from app.ai.memory.remote_memory import RemoteMemory
 
 
 def memory_factory(memory_type: str, db: Optional[AsyncSession] = None, session_id: Optional[str] = None) -> BaseMemory:
     if memory_type == "local":
-        return LocalMemory()
+        return LocalMemory(session_id=session_id) if session_id is not None else LocalMemory()
     elif memory_type == "remote":
         if db is None or session_id is None:
             raise ValueError("Database session and session ID are required for remote memory.")
         return RemoteMemory(db=db, session_id=session_id)
+    elif memory_type == "redis":
+        if session_id is None:
+            raise ValueError("Session ID is required for redis memory.")
+        return RedisMemory(session_id=session_id)
     else:
-        raise ValueError(f"Invalid memory type: {memory_type}")
\ No newline at end of file
+        raise ValueError(f"Invalid memory type: {memory_type}")
@@ -1,11 +1,42 @@
 from abc import ABC, abstractmethod
-from typing import List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, cast
+
 from openai.types.chat import ChatCompletionMessageParam
 
+# Roles replayed to the model as conversation history. Tool exchanges are
+# persisted for auditing under TOOL_LOG_ROLE but never replayed: a sliding
+# window could cut an assistant tool call from its results, which the
+# completions API rejects.
+REPLAYED_ROLES = ("user", "assistant")
+TOOL_LOG_ROLE = "tool_log"
+
+
+class MemoryTurn:
+    """Buffers everything a turn produces so it can be persisted in one write."""
+
+    def __init__(self, memory: "BaseMemory"):
+        self.memory = memory
+        self.messages: List[Dict[str, Any]] = []
+
+    def add_message(self, role: Literal["user", "assistant"], content: str) -> None:
+        self.messages.append({"role": role, "content": content})
+
+    def add_tool_messages(self, messages: List[ChatCompletionMessageParam]) -> None:
+        """Buffer the assistant tool calls and tool results exchanged during the turn."""
+        for message in messages:
+            self.messages.append({"role": TOOL_LOG_ROLE, "message": dict(message)})
+
+    async def flush(self) -> None:
+        if not self.messages:
+            return
+        messages, self.messages = self.messages, []
+        await self.memory.add_messages(messages)
+
 
 class BaseMemory(ABC):
     @abstractmethod
-    async def get_messages(self) -> Optional[List[ChatCompletionMessageParam]]:
+    async def get_messages(self, query: Optional[str] = None) -> Optional[List[ChatCompletionMessageParam]]:
+        """Return the recent window; backends with recall may add older messages relevant to query."""
         pass
 
     @abstractmethod
@@ -14,4 +45,17 @@ class BaseMemory(ABC):
 
     @abstractmethod
     async def clear_messages(self) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """Persist several messages; backends override this to write them in one go."""
+        for message in messages:
+            if message["role"] in REPLAYED_ROLES:
+                await self.add_message(role=message["role"], content=message["content"])
+
+    def start_turn(self) -> MemoryTurn:
+        return MemoryTurn(self)
+
+
+def replayed_messages(messages: List[Dict[str, Any]]) -> List[ChatCompletionMessageParam]:
+    return [cast(ChatCompletionMessageParam, message) for message in messages if message["role"] in REPLAYED_ROLES]
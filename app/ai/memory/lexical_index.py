@@ -0,0 +1,184 @@
+import heapq
+import math
+import os
+import re
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.ai.memory.session_cache import (CHAT_HISTORY_CHANNEL,
+                                         CHAT_HISTORY_CLEARED_CHANNEL)
+from app.db.notifications import notification_hub
+
+CHAT_RECALL_TOP_K = int(os.getenv("CHAT_RECALL_TOP_K", "3"))
+CHAT_RECALL_MAX_SESSIONS = int(os.getenv("CHAT_RECALL_MAX_SESSIONS", "50"))
+# Terms present in more than this fraction of documents carry almost no
+# BM25 weight but dominate scoring time, so they are skipped like stopwords.
+# Small histories are exempt since scanning them is cheap anyway, and so are
+# queries made only of such terms.
+CHAT_RECALL_MAX_DF_RATIO = float(os.getenv("CHAT_RECALL_MAX_DF_RATIO", "0.05"))
+MIN_DF_CAP = 50
+# Ids are handed out when a row is inserted but become visible when its
+# transaction commits, so a catch-up re-reads this many ids below the
+# watermark to pick up rows that committed after higher ones.
+CHAT_RECALL_REPLAY_MARGIN = int(os.getenv("CHAT_RECALL_REPLAY_MARGIN", "1000"))
+
+_TOKEN = re.compile(r"\w{2,}", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class IndexedMessage:
+    __slots__ = ("role", "content", "created_at")
+
+    def __init__(self, role: str, content: str, created_at: Optional[datetime]):
+        self.role = role
+        self.content = content
+        self.created_at = created_at
+
+
+class BM25Index:
+    """
+    Incrementally maintained Okapi BM25 inverted index over one session's messages.
+
+    Scoring walks only the postings of the query terms, rarest first, so a
+    query costs time proportional to how many messages share its terms rather
+    than to the size of the history, and common terms are skipped entirely
+    once they can no longer change the top k.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.max_term_frequency: Dict[str, int] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.documents: Dict[int, IndexedMessage] = {}
+        self.doc_order: List[int] = []
+        self.total_length = 0
+        # Highest id read from the database; lower ids may still be missing
+        # when their transaction committed late (see CHAT_RECALL_REPLAY_MARGIN)
+        self.watermark = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: int, role: str, content: str, created_at: Optional[datetime] = None) -> None:
+        if doc_id in self.doc_lengths:
+            return
+        terms = Counter(tokenize(content))
+        length = sum(terms.values())
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+            if frequency > self.max_term_frequency.get(term, 0):
+                self.max_term_frequency[term] = frequency
+        self.doc_lengths[doc_id] = length
+        self.documents[doc_id] = IndexedMessage(role, content, created_at)
+        self.total_length += length
+        if self.doc_order and doc_id < self.doc_order[-1]:
+            self.doc_order.append(doc_id)
+            self.doc_order.sort()
+        else:
+            self.doc_order.append(doc_id)
+
+    def recent_ids(self, count: int) -> List[int]:
+        return self.doc_order[-count:] if count > 0 else []
+
+    def search(self, query: str, k: int, exclude: Optional[set] = None) -> List[Tuple[int, float]]:
+        doc_count = len(self.doc_lengths)
+        if not doc_count or k <= 0:
+            return []
+        exclude = exclude or set()
+        k1, b = self.k1, self.b
+        length_base = k1 * (1 - b)
+        length_scale = k1 * b / (self.total_length / doc_count)
+        max_df = max(MIN_DF_CAP, int(doc_count * CHAT_RECALL_MAX_DF_RATIO))
+
+        matched = [(term, self.postings[term]) for term in set(tokenize(query)) if term in self.postings]
+        rare = [(term, postings) for term, postings in matched if len(postings) <= max_df]
+        terms = []
+        # Common terms are only skipped when rarer ones are left to rank by
+        for term, postings in rare or matched:
+            df = len(postings)
+            weight = math.log(1 + (doc_count - df + 0.5) / (df + 0.5)) * (k1 + 1)
+            max_tf = self.max_term_frequency[term]
+            terms.append((postings, weight, weight * max_tf / (max_tf + length_base)))
+        terms.sort(key=lambda term: len(term[0]))
+
+        # MaxScore: once the best any unseen document could still reach with
+        # the remaining (more common) terms falls below the current k-th
+        # score, those terms only refine documents that are already ranked.
+        remaining_bound = sum(term[2] for term in terms)
+        scores: Dict[int, float] = {}
+        lengths = self.doc_lengths
+        for postings, weight, upper_bound in terms:
+            if len(scores) >= k and remaining_bound < heapq.nlargest(k, scores.values())[-1]:
+                for doc_id in scores:
+                    frequency = postings.get(doc_id)
+                    if frequency:
+                        scores[doc_id] += weight * frequency / (frequency + length_base + length_scale * lengths[doc_id])
+            else:
+                for doc_id, frequency in postings.items():
+                    if doc_id not in exclude:
+                        scores[doc_id] = scores.get(doc_id, 0.0) + (
+                            weight * frequency / (frequency + length_base + length_scale * lengths[doc_id])
+                        )
+            remaining_bound -= upper_bound
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class SessionIndexRegistry:
+    """LRU of per-session indexes, marked stale by cross-worker notifications."""
+
+    def __init__(self, max_sessions: int = CHAT_RECALL_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._stale: set = set()
+
+    def get(self, session_id: str) -> Optional[BM25Index]:
+        index = self._indexes.get(session_id)
+        if index is not None:
+            self._indexes.move_to_end(session_id)
+        return index
+
+    def create(self, session_id: str) -> BM25Index:
+        index = BM25Index()
+        self._indexes[session_id] = index
+        self._indexes.move_to_end(session_id)
+        while len(self._indexes) > self.max_sessions:
+            evicted, _ = self._indexes.popitem(last=False)
+            self._stale.discard(evicted)
+        return index
+
+    def needs_catch_up(self, session_id: str) -> bool:
+        """Whether rows written elsewhere may be missing from the session's index."""
+        return session_id in self._stale or not notification_hub.listening
+
+    def mark_caught_up(self, session_id: str) -> None:
+        self._stale.discard(session_id)
+
+    def mark_stale(self, session_id: str) -> None:
+        if session_id in self._indexes:
+            self._stale.add(session_id)
+
+    def drop(self, session_id: str) -> None:
+        self._indexes.pop(session_id, None)
+        self._stale.discard(session_id)
+
+    def mark_all_stale(self) -> None:
+        self._stale.update(self._indexes)
+
+
+session_indexes = SessionIndexRegistry()
+
+notification_hub.subscribe(
+    CHAT_HISTORY_CHANNEL,
+    lambda _channel, session_id: session_indexes.mark_stale(session_id),
+    on_reset=session_indexes.mark_all_stale,
+)
+notification_hub.subscribe(
+    CHAT_HISTORY_CLEARED_CHANNEL,
+    lambda _channel, session_id: session_indexes.drop(session_id),
+)
@@ -1,23 +1,98 @@
-from typing import List, Literal, Optional, cast
+import os
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Literal, Optional, Tuple, cast
 
 from openai.types.chat import ChatCompletionMessageParam
 
-from app.ai.memory.base import BaseMemory
+from app.ai.memory.base import BaseMemory, replayed_messages
+from app.core.tokens import estimate_tokens
+
+CHAT_MEMORY_LOCAL_MAX_TOKENS = int(os.getenv("CHAT_MEMORY_LOCAL_MAX_TOKENS", "4000"))
+CHAT_MEMORY_LOCAL_MAX_SESSIONS = int(os.getenv("CHAT_MEMORY_LOCAL_MAX_SESSIONS", "100"))
+
+LOCAL_SESSION_ID = "local"
+
+
+class SessionHistory:
+    """One session's messages, oldest evicted first once over the token budget."""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.messages: Deque[Tuple[ChatCompletionMessageParam, int]] = deque()
+        self.tokens = 0
+
+    def append(self, message: ChatCompletionMessageParam) -> None:
+        cost = estimate_tokens(str(message.get("content") or ""))
+        self.messages.append((message, cost))
+        self.tokens += cost
+        # Always keep the newest message, even when it alone exceeds the budget
+        while self.tokens > self.max_tokens and len(self.messages) > 1:
+            _, evicted = self.messages.popleft()
+            self.tokens -= evicted
+
+    def snapshot(self) -> List[ChatCompletionMessageParam]:
+        return [message for message, _ in self.messages]
+
+
+class LocalSessionStore:
+    """
+    In-process chat histories keyed by session id.
+
+    Each session is bounded by a token budget and the least recently used
+    sessions are dropped once more than ``max_sessions`` are held, so memory
+    stays flat for a long-running single-process deployment.
+    """
+
+    def __init__(self, max_sessions: int = CHAT_MEMORY_LOCAL_MAX_SESSIONS,
+                 max_tokens: int = CHAT_MEMORY_LOCAL_MAX_TOKENS):
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self._sessions: "OrderedDict[str, SessionHistory]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[SessionHistory]:
+        history = self._sessions.get(session_id)
+        if history is not None:
+            self._sessions.move_to_end(session_id)
+        return history
+
+    def get_or_create(self, session_id: str) -> SessionHistory:
+        history = self.get(session_id)
+        if history is None:
+            history = SessionHistory(self.max_tokens)
+            self._sessions[session_id] = history
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return history
+
+    def drop(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+local_sessions = LocalSessionStore()
 
 
 class LocalMemory(BaseMemory):
-    def __init__(self):
-        self._message_history: List[ChatCompletionMessageParam] = []
+    def __init__(self, session_id: str = LOCAL_SESSION_ID, store: LocalSessionStore = local_sessions):
+        self.session_id = session_id
+        self.store = store
 
-    async def get_messages(self) -> Optional[List[ChatCompletionMessageParam]]:
-        return self._message_history
+    async def get_messages(self, query: Optional[str] = None) -> Optional[List[ChatCompletionMessageParam]]:
+        history = self.store.get(self.session_id)
+        return history.snapshot() if history is not None else []
 
     async def add_message(self, role: Literal["user", "assistant"], content: str) -> None:
-        if role == "user":
-            message = cast(ChatCompletionMessageParam, {"role": "user", "content": content})
-        else:
-            message = cast(ChatCompletionMessageParam, {"role": "assistant", "content": content})
-        self._message_history.append(message)
+        await self.add_messages([{"role": role, "content": content}])
+
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        replayed = replayed_messages(messages)
+        if not replayed:
+            return
+        history = self.store.get_or_create(self.session_id)
+        for message in replayed:
+            history.append(cast(ChatCompletionMessageParam, {"role": message["role"], "content": message["content"]}))
 
     async def clear_messages(self) -> None:
-        self._message_history = []
+        self.store.drop(self.session_id)
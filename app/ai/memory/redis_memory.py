@@ -0,0 +1,91 @@
+import json
+import os
+from typing import Any, Dict, List, Literal, Optional
+
+from openai.types.chat import ChatCompletionMessageParam
+from redis.asyncio import Redis
+
+from app.ai.memory.base import BaseMemory, replayed_messages
+from app.ai.memory.session_cache import CHAT_MEMORY_WINDOW
+from app.db.buffered_writer import BufferedInsertWriter
+from app.db.models.chat_history import ChatHistory
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CHAT_MEMORY_REDIS_MAX_MESSAGES = int(os.getenv("CHAT_MEMORY_REDIS_MAX_MESSAGES", "200"))
+CHAT_MEMORY_REDIS_TTL = int(os.getenv("CHAT_MEMORY_REDIS_TTL", str(7 * 24 * 3600)))
+# Write every turn behind to chat_history as the durable archive
+CHAT_MEMORY_ARCHIVE = os.getenv("CHAT_MEMORY_ARCHIVE", "1").lower() in ("1", "true", "yes")
+
+_client: Optional[Redis] = None
+
+chat_history_archiver = BufferedInsertWriter(ChatHistory, flush_interval=2.0, batch_size=100)
+
+
+def get_redis_client() -> Redis:
+    """Get or create the process wide Redis client."""
+    global _client
+    if _client is None:
+        _client = Redis.from_url(REDIS_URL, decode_responses=True)
+    return _client
+
+
+async def close_redis_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class RedisMemory(BaseMemory):
+    """
+    Chat memory kept in a capped Redis list per session.
+
+    Reads and writes are pipelined so each costs one round trip, and every
+    access refreshes the key's TTL so idle sessions expire on their own. Any
+    ``redis.asyncio.Redis`` compatible client can be injected, e.g.
+    ``fakeredis.aioredis.FakeRedis()`` as a local stand-in.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        client: Optional[Redis] = None,
+        window: int = CHAT_MEMORY_WINDOW,
+        max_messages: int = CHAT_MEMORY_REDIS_MAX_MESSAGES,
+        ttl: int = CHAT_MEMORY_REDIS_TTL,
+        archiver: Optional[BufferedInsertWriter] = chat_history_archiver if CHAT_MEMORY_ARCHIVE else None,
+    ):
+        self.client = client or get_redis_client()
+        self.session_id = session_id
+        self.key = f"chat_history:{session_id}"
+        self.retrieve_limit = window
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.archiver = archiver
+
+    async def get_messages(self, query: Optional[str] = None) -> Optional[List[ChatCompletionMessageParam]]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.lrange(self.key, -self.retrieve_limit, -1)
+            pipe.expire(self.key, self.ttl)
+            raw_messages, _ = await pipe.execute()
+        return [json.loads(raw) for raw in raw_messages]
+
+    async def add_message(self, role: Literal["user", "assistant"], content: str) -> None:
+        await self.add_messages([{"role": role, "content": content}])
+
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        replayed = replayed_messages(messages)
+        if replayed:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.rpush(self.key, *(json.dumps(message) for message in replayed))
+                pipe.ltrim(self.key, -self.max_messages, -1)
+                pipe.expire(self.key, self.ttl)
+                await pipe.execute()
+        if self.archiver is not None:
+            self.archiver.record_many(
+                [{"session_id": self.session_id, "message": message} for message in messages]
+            )
+
+    async def clear_messages(self) -> None:
+        """Drop the working memory; the chat_history archive is left untouched."""
+        await self.client.delete(self.key)
@@ -1,41 +1,144 @@
-from typing import List, Literal, Optional, cast
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, cast
 
 from openai.types.chat import ChatCompletionMessageParam
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.ai.memory.base import BaseMemory
+from app.ai.memory.base import (REPLAYED_ROLES, BaseMemory,
+                                replayed_messages)
+from app.ai.memory.lexical_index import (CHAT_RECALL_REPLAY_MARGIN,
+                                         CHAT_RECALL_TOP_K, BM25Index,
+                                         SessionIndexRegistry,
+                                         session_indexes)
+from app.ai.memory.session_cache import (CHAT_HISTORY_CHANNEL,
+                                         CHAT_HISTORY_CLEARED_CHANNEL,
+                                         CHAT_MEMORY_WINDOW,
+                                         SessionWindowCache,
+                                         chat_window_cache)
 from app.db.models.chat_history import ChatHistory
+from app.db.notifications import notify
 from app.db.repository.chat_history_repository import ChatHistoryRepository
+from app.db.unit_of_work import current_unit_of_work, use_read_session
+
+RECALL_MAX_CHARS = 500
 
 
 class RemoteMemory(BaseMemory):
-    def __init__(self, db: AsyncSession, session_id: str):
+    def __init__(self, db: AsyncSession, session_id: str, window: int = CHAT_MEMORY_WINDOW,
+                 cache: SessionWindowCache = chat_window_cache,
+                 indexes: SessionIndexRegistry = session_indexes,
+                 recall_top_k: int = CHAT_RECALL_TOP_K):
         self.repository = ChatHistoryRepository(db)
         self.session_id = session_id
-        self.retrieve_limit = 5
+        self.retrieve_limit = window
+        self.cache = cache
+        self.indexes = indexes
+        self.recall_top_k = recall_top_k
+
+    async def get_messages(self, query: Optional[str] = None) -> Optional[List[ChatCompletionMessageParam]]:
+        history = await self._get_window()
+        if query and self.recall_top_k > 0:
+            recalled = await self.recall(query)
+            if recalled is not None:
+                return [recalled, *history]
+        return history
+
+    async def _get_window(self) -> List[ChatCompletionMessageParam]:
+        cached = self.cache.get(self.session_id)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation(self.session_id)
+        async with use_read_session(self.repository.db) as db:
+            rows = await ChatHistoryRepository(db).get_columns(
+                [ChatHistory.message],
+                where=[
+                    ChatHistory.session_id == self.session_id,
+                    ChatHistory.message["role"].as_string().in_(REPLAYED_ROLES),
+                ],
+                limit=self.retrieve_limit,
+                order_by=[ChatHistory.id.desc()]
+            )
+        # Fetched newest-first to apply the window, the model expects oldest-first
+        history = [cast(ChatCompletionMessageParam, row.message) for row in reversed(rows)]
+        if self.retrieve_limit == self.cache.window:
+            self.cache.prime(self.session_id, history, generation)
+        return history
+
+    async def _ensure_index(self) -> BM25Index:
+        """Load the session's index on first use and pick up rows other workers wrote since."""
+        index = self.indexes.get(self.session_id)
+        if index is None:
+            index = self.indexes.create(self.session_id)
+        elif not self.indexes.needs_catch_up(self.session_id):
+            return index
+
+        # Cleared before reading so a notification arriving mid-load marks it stale again
+        self.indexes.mark_caught_up(self.session_id)
+        # Rows already indexed are skipped by add(), so re-reading the margin is harmless
+        after = max(index.watermark - CHAT_RECALL_REPLAY_MARGIN, 0)
+        async with use_read_session(self.repository.db) as db:
+            rows = ChatHistoryRepository(db).stream_messages_after(self.session_id, after, REPLAYED_ROLES)
+            async for row in rows:
+                index.add(row.id, row.message["role"], str(row.message.get("content") or ""), row.created_at)
+                index.watermark = max(index.watermark, row.id)
+        return index
 
-    def _to_chat_completion_message(self, message: ChatHistory) -> ChatCompletionMessageParam:
-        msg_dict = message.message
-        return cast(ChatCompletionMessageParam, msg_dict)
+    async def recall(self, query: str) -> Optional[ChatCompletionMessageParam]:
+        """
+        Find older messages relevant to the query that fall outside the recent window.
 
-    async def get_messages(self) -> Optional[List[ChatCompletionMessageParam]]:
-        messages = await self.repository.get_all(
-            where=[ChatHistory.session_id == self.session_id],
-            limit=self.retrieve_limit,
-            order_by=[ChatHistory.id.desc()]
-        )
-        return [self._to_chat_completion_message(message) for message in messages]
+        Args:
+            query: The incoming user message
+
+        Returns:
+            A system message quoting the recalled messages, or None when nothing matches
+        """
+        index = await self._ensure_index()
+        recent = set(index.recent_ids(self.retrieve_limit))
+        hits = index.search(query, self.recall_top_k, exclude=recent)
+        if not hits:
+            return None
+
+        lines = []
+        for doc_id, _ in sorted(hits):
+            document = index.documents[doc_id]
+            date = document.created_at.strftime("%Y-%m-%d") if document.created_at else "earlier"
+            content = document.content
+            if len(content) > RECALL_MAX_CHARS:
+                content = content[:RECALL_MAX_CHARS] + "..."
+            lines.append(f"- [{date}] {document.role}: {content}")
+        return cast(ChatCompletionMessageParam, {
+            "role": "system",
+            "content": "Relevant earlier messages from this conversation:\n" + "\n".join(lines),
+        })
 
     async def add_message(self, role: Literal["user", "assistant"], content: str) -> None:
-        message = {"role": role, "content": content}
-        await self.repository.create(
-            {
-                "session_id": self.session_id,
-                "message": message,
-            }
-        )
+        await self.add_messages([{"role": role, "content": content}])
+
+    async def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        await notify(self.repository.db, CHAT_HISTORY_CHANNEL, self.session_id)
+        ids = await self.repository.add_messages(self.session_id, messages)
+        self.cache.append(self.session_id, replayed_messages(messages))
+        uow = current_unit_of_work()
+        if uow is not None and uow.session is self.repository.db:
+            uow.on_rollback(self._forget_session)
+
+        index = self.indexes.get(self.session_id)
+        if index is not None:
+            now = datetime.now()
+            for doc_id, message in zip(ids, messages):
+                if message["role"] in REPLAYED_ROLES:
+                    index.add(doc_id, message["role"], str(message.get("content") or ""), now)
+
+    def _forget_session(self) -> None:
+        """Drop cached state for the session after its uncommitted writes were rolled back."""
+        self.cache.invalidate(self.session_id)
+        self.indexes.drop(self.session_id)
 
     async def clear_messages(self) -> None:
-        messages = await self.repository.get_all(where=[ChatHistory.session_id == self.session_id])
-        for message in messages:
-            await self.repository.delete(message.id)
\ No newline at end of file
+        self.cache.invalidate(self.session_id)
+        self.indexes.drop(self.session_id)
+        await notify(self.repository.db, CHAT_HISTORY_CLEARED_CHANNEL, self.session_id)
+        await self.repository.delete_session(self.session_id)
+        self.cache.invalidate(self.session_id)
@@ -0,0 +1,92 @@
+import os
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+from openai.types.chat import ChatCompletionMessageParam
+
+from app.db.notifications import notification_hub
+
+CHAT_HISTORY_CHANNEL = "chat_history_changed"
+CHAT_HISTORY_CLEARED_CHANNEL = "chat_history_cleared"
+
+CHAT_MEMORY_WINDOW = int(os.getenv("CHAT_MEMORY_WINDOW", "5"))
+CHAT_MEMORY_CACHE_SESSIONS = int(os.getenv("CHAT_MEMORY_CACHE_SESSIONS", "1000"))
+# auto: trust the cache only while the cross-worker invalidation listener is up
+# process: always trust it (single worker deployments)
+# off: always read from the database
+CHAT_MEMORY_CACHE = os.getenv("CHAT_MEMORY_CACHE", "auto").lower()
+
+
+class SessionWindowCache:
+    """
+    Per-session ring buffers holding the most recent chat messages.
+
+    Writers append through the cache after persisting, so the common read path
+    never touches the database. Each session carries a generation number that
+    is bumped on invalidation; a reader that loaded from the database only
+    primes the cache if no invalidation happened while it was reading.
+    """
+
+    def __init__(self, window: int = CHAT_MEMORY_WINDOW, max_sessions: int = CHAT_MEMORY_CACHE_SESSIONS,
+                 mode: str = CHAT_MEMORY_CACHE):
+        self.window = window
+        self.max_sessions = max_sessions
+        self.mode = mode
+        self._sessions: "OrderedDict[str, Deque[ChatCompletionMessageParam]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    @property
+    def usable(self) -> bool:
+        if self.mode == "off":
+            return False
+        if self.mode == "process":
+            return True
+        return notification_hub.listening
+
+    def generation(self, session_id: str) -> int:
+        return self._generations.get(session_id, 0)
+
+    def get(self, session_id: str) -> Optional[List[ChatCompletionMessageParam]]:
+        if not self.usable:
+            return None
+        buffer = self._sessions.get(session_id)
+        if buffer is None:
+            return None
+        self._sessions.move_to_end(session_id)
+        return list(buffer)
+
+    def prime(self, session_id: str, messages: List[ChatCompletionMessageParam], generation: int) -> None:
+        """Store a window loaded from the database unless it went stale meanwhile."""
+        if generation != self.generation(session_id):
+            return
+        self._sessions[session_id] = deque(messages, maxlen=self.window)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def append(self, session_id: str, messages: List[ChatCompletionMessageParam]) -> None:
+        """Write-through for sessions already cached; unknown sessions load lazily."""
+        buffer = self._sessions.get(session_id)
+        if buffer is not None:
+            buffer.extend(messages)
+
+    def invalidate(self, session_id: str) -> None:
+        self._generations[session_id] = self.generation(session_id) + 1
+        self._sessions.pop(session_id, None)
+
+    def clear(self) -> None:
+        for session_id in list(self._sessions):
+            self.invalidate(session_id)
+
+
+chat_window_cache = SessionWindowCache()
+
+notification_hub.subscribe(
+    CHAT_HISTORY_CHANNEL,
+    lambda _channel, session_id: chat_window_cache.invalidate(session_id),
+    on_reset=chat_window_cache.clear,
+)
+notification_hub.subscribe(
+    CHAT_HISTORY_CLEARED_CHANNEL,
+    lambda _channel, session_id: chat_window_cache.invalidate(session_id),
+)
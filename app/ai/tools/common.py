@@ -1,5 +1,6 @@
 import json
 import logging
+import time
 from typing import List, Literal, Optional, TypedDict
 
 from dotenv import load_dotenv
@@ -14,11 +15,17 @@ from openai.types.chat.chat_completion_message_tool_call import \
     ChatCompletionMessageToolCall
 from pydantic import BaseModel, Field
 
+from app.ai.tools.dashboard_tool import get_dashboard
+from app.ai.tools.entity_tool import resolve_entity
+from app.ai.tools.goal_progress_tool import get_goal_progress
 from app.ai.tools.perplexity_tool import web_search
 from app.ai.tools.preferences_tool import update_preferences
-from app.ai.tools.sql_tool import delete, insert, query, update
+from app.ai.tools.sql_tool import batch, delete, insert, query, update
+from app.ai.tools.task_tree_tool import get_task_tree
 from app.ai.tools.todoist_tool import create_task
+from app.core import metrics
 from app.core.scheduler import schedule_interaction
+from app.services.usage_service import usage_recorder
 
 load_dotenv()
 
@@ -61,10 +68,12 @@ async def handle_tool_calls(
         
         try:
             if function_name in function_map:
-                result = await function_map[function_name](**function_args)
+                with metrics.observe_latency(metrics.TOOL_LATENCY, tool=function_name):
+                    result = await function_map[function_name](**function_args)
                 function_result_message: ChatCompletionToolMessageParam = {
                     "role": "tool",
-                    "content": json.dumps(result),
+                    # Text results go through as is; quoting them again only costs tokens
+                    "content": result if isinstance(result, str) else json.dumps(result),
                     "tool_call_id": tool_call.id,
                 }
                 messages.append(function_result_message)
@@ -86,7 +95,8 @@ async def execute_conversation_with_tools(
     messages: List[ChatCompletionMessageParam],
     tools: List[ChatCompletionToolParam],
     model: str = "o3-mini",
-    max_iterations: int = 10
+    max_iterations: int = 10,
+    iteration: int = 0
 ) -> StructuredResponse:
     """Execute a conversation with tool calling capabilities with iteration limits."""
     
@@ -97,16 +107,36 @@ async def execute_conversation_with_tools(
             "content": "You must respond with JSON that matches this structure: {\"content\": string, \"is_final\": boolean}. The content field should contain your message, and is_final should be true only when you have completed all necessary tool calls and have a final answer."
         })
 
-    response = client.chat.completions.create(
+    started = time.perf_counter()
+    with metrics.observe_latency(metrics.LLM_CALL_LATENCY, model=model):
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=tools,
+            tool_choice="auto",
+            response_format={ "type": "json_object" }
+        )
+    latency = time.perf_counter() - started
+    metrics.record_token_usage(model, response.usage)
+
+    choice = response.choices[0]
+    usage_recorder.record_chat_completion(
         model=model,
+        usage=response.usage,
+        latency=latency,
+        iteration=iteration,
         messages=messages,
-        tools=tools,
-        tool_choice="auto",
-        response_format={ "type": "json_object" }
+        tool_names=[tool_call.function.name for tool_call in choice.message.tool_calls or []]
     )
-
-    choice = response.choices[0]
-    logger.info(f"[DH] Choice: \n{choice}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[DH] Choice: finish_reason=%s",
+            choice.finish_reason,
+            extra={"fields": {
+                "tool_calls": [tool_call.function.name for tool_call in choice.message.tool_calls or []],
+                "content": choice.message.content,
+            }}
+        )
     
     # Parse and validate the structured output
     try:
@@ -146,7 +176,7 @@ async def execute_conversation_with_tools(
     if choice.message.tool_calls:
         messages = await handle_tool_calls(choice.message.tool_calls, messages)
         return await execute_conversation_with_tools(
-            client, messages, tools, model, max_iterations - 1
+            client, messages, tools, model, max_iterations - 1, iteration + 1
         )
     
     if structured_response.is_final:
@@ -164,7 +194,7 @@ async def execute_conversation_with_tools(
             "content": "WARNING: Maximum iterations approaching. You MUST provide a Final Answer with is_final: true in your response on this turn."
         })
     return await execute_conversation_with_tools(
-        client, messages, tools, model, max_iterations - 1
+        client, messages, tools, model, max_iterations - 1, iteration + 1
     )
     
 function_map = {
@@ -173,6 +203,11 @@ function_map = {
     "execute_update": update,
     "execute_query": query,
     "execute_delete": delete,
+    "execute_batch": batch,
+    "get_task_tree": get_task_tree,
+    "resolve_entity": resolve_entity,
+    "get_dashboard": get_dashboard,
+    "get_goal_progress": get_goal_progress,
     "web_search": web_search,
     "schedule_interaction": schedule_interaction,
     "update_preferences": update_preferences,
@@ -283,6 +318,147 @@ tools: List[ChatCompletionToolParam] = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "execute_batch",
+            "description": "Execute several INSERT, UPDATE and DELETE statements in order in one transaction: either all of them apply or none do. Returns each statement's row count and RETURNING rows",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "statements": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "statement": {
+                                    "type": "string",
+                                    "description": "An INSERT, UPDATE or DELETE statement with named parameters (e.g., :param_name). Add RETURNING to expose columns to later statements"
+                                },
+                                "values": {
+                                    "type": "object",
+                                    "description": "Dictionary of parameter names and their values. A value of \"$<index>.<column>\" (e.g., \"$0.task_id\") uses that column of the first row RETURNed by the statement at that index"
+                                }
+                            },
+                            "required": ["statement", "values"]
+                        },
+                        "description": "Statements to run, in order"
+                    },
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Detailed explanation of why this tool was chosen and how it helps achieve the goal. Include which tables are written, how the statements depend on each other, and why they belong together."
+                    }
+                },
+                "required": ["statements", "reasoning"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_task_tree",
+            "description": "Fetch a task with all of its subtasks at every level, or every task of a project as a hierarchy, in a single call",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "task_id": {
+                        "type": "integer",
+                        "description": "Root task whose subtasks to fetch. Provide either task_id or project_id"
+                    },
+                    "project_id": {
+                        "type": "integer",
+                        "description": "Project whose whole task hierarchy to fetch. Provide either task_id or project_id"
+                    },
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Detailed explanation of why this tool was chosen and how it helps achieve the goal. Include which task or project you need the breakdown for and why."
+                    }
+                },
+                "required": ["reasoning"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "resolve_entity",
+            "description": "Find tasks, projects or goals by approximate name, tolerating typos and partial names. Returns the best matches with their ids, status and a similarity score between 0 and 1",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "The name, or part of it, as the user referred to it"
+                    },
+                    "entity_type": {
+                        "type": "string",
+                        "enum": ["task", "project", "goal"],
+                        "description": "Restrict the search to one kind of entity; omit to search all of them"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of matches to return (default 5)"
+                    },
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Detailed explanation of why this tool was chosen and how it helps achieve the goal. Include which entity the user referred to and what you will do with its id."
+                    }
+                },
+                "required": ["name", "reasoning"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_dashboard",
+            "description": "Get an overview in one call: active projects with task counts by status, in-progress tasks with no recent progress log, and active goals with their completion ratio",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "stale_days": {
+                        "type": "integer",
+                        "description": "Days without a progress log after which an in-progress task is listed as stale (default 3)"
+                    },
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Detailed explanation of why this tool was chosen and how it helps achieve the goal. Include what overview the user needs and how you will use it."
+                    }
+                },
+                "required": ["reasoning"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_goal_progress",
+            "description": "Get a goal's running total against its target and how much was logged toward it today or this week and in recent days or weeks, from precomputed rollups of progress_logs",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "goal_id": {
+                        "type": "integer",
+                        "description": "Goal to report on"
+                    },
+                    "period": {
+                        "type": "string",
+                        "enum": ["day", "week"],
+                        "description": "Roll logs up per day or per ISO week (default week)"
+                    },
+                    "periods": {
+                        "type": "integer",
+                        "description": "How many recent periods with logs to list (default 4)"
+                    },
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Detailed explanation of why this tool was chosen and how it helps achieve the goal. Include which goal and what progress question you are answering."
+                    }
+                },
+                "required": ["goal_id", "reasoning"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -0,0 +1,44 @@
+from typing import Any, List, Optional
+
+from app.services.dashboard_service import get_dashboard_snapshot
+
+from .result_encoder import encode_rows, encode_value
+from .tool_logging import log_tool_execution, setup_tool_logger
+
+# Set up logger for this tool
+logger = setup_tool_logger("dashboard")
+
+
+def _section(title: str, rows: List[Any]) -> str:
+    # refreshed_at is the same on every row and is reported once in the header
+    rows = [{k: v for k, v in row.items() if k != "refreshed_at"} for row in rows]
+    return f"{title}:\n{encode_rows(rows) if rows else 'None'}"
+
+
+def format_dashboard(snapshot: dict) -> str:
+    if snapshot["snapshot"] and snapshot["refreshed_at"] is not None:
+        header = f"Dashboard snapshot as of {encode_value(snapshot['refreshed_at'])}"
+    else:
+        header = "Dashboard (live)"
+    return "\n\n".join([
+        header,
+        _section("Active projects with task counts by status", snapshot["projects"]),
+        _section(
+            f"In-progress tasks with no progress log in {snapshot['stale_days']}+ days",
+            snapshot["stale_tasks"]
+        ),
+        _section("Active goals with completion ratio (current_value / target_value)", snapshot["goals"]),
+    ])
+
+
+async def get_dashboard(reasoning: str, stale_days: Optional[int] = None):
+    log_tool_execution(
+        logger=logger,
+        tool_name="get_dashboard",
+        reasoning=reasoning,
+        stale_days=stale_days
+    )
+    if stale_days is not None and stale_days < 0:
+        return {"success": False, "message": "stale_days must not be negative"}
+    snapshot = await get_dashboard_snapshot(stale_days)
+    return format_dashboard(snapshot)
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from app.services.entity_resolver import ENTITY_TYPES, entity_resolver
+
+from .result_encoder import encode_rows
+from .tool_logging import log_tool_execution, setup_tool_logger
+
+# Set up logger for this tool
+logger = setup_tool_logger("entity")
+
+RESOLVE_MAX_LIMIT = 20
+
+
+async def resolve_entity(reasoning: str, name: str, entity_type: Optional[str] = None, limit: int = 5):
+    log_tool_execution(
+        logger=logger,
+        tool_name="resolve_entity",
+        reasoning=reasoning,
+        name=name,
+        entity_type=entity_type,
+        limit=limit
+    )
+    if entity_type is not None and entity_type not in ENTITY_TYPES:
+        return {"success": False, "message": f"entity_type must be one of: {', '.join(ENTITY_TYPES)}"}
+    if not name or not name.strip():
+        return {"success": False, "message": "Provide the name to look for"}
+
+    entity_types = [entity_type] if entity_type else list(ENTITY_TYPES)
+    matches = await entity_resolver.resolve(name, entity_types, max(1, min(limit, RESOLVE_MAX_LIMIT)))
+    if not matches:
+        return f"No {entity_type or 'task, project or goal'} matches '{name}'"
+    return encode_rows([
+        {"type": match.entity_type, "id": match.id, "name": match.name, "status": match.status, "score": match.score}
+        for match in matches
+    ])
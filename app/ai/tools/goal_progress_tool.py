@@ -0,0 +1,50 @@
+from app.services.goal_progress_service import get_goal_progress as load_goal_progress
+
+from .result_encoder import encode_rows, encode_value
+from .tool_logging import log_tool_execution, setup_tool_logger
+
+# Set up logger for this tool
+logger = setup_tool_logger("goal_progress")
+
+PERIODS = ("day", "week")
+
+
+def format_goal_progress(progress: dict, period: str) -> str:
+    goal = progress["goal"]
+    current = progress["current"]
+    lines = [f"Goal {goal.goal_id}: {goal.title} ({goal.status})"]
+
+    unit = f" {goal.unit}" if goal.unit else ""
+    total = f"{encode_value(goal.current_value) or 0}{unit}"
+    if goal.target_value:
+        ratio = (goal.current_value or 0) / goal.target_value
+        total += f" of {encode_value(goal.target_value)}{unit} ({ratio:.0%})"
+    lines.append(f"Running total: {total}")
+
+    this_period = "today" if period == "day" else f"this week (from {progress['period_start'].isoformat()})"
+    if current is None:
+        lines.append(f"Logged {this_period}: nothing")
+    else:
+        lines.append(f"Logged {this_period}: {encode_value(current.total)} in {current.entries} entries")
+
+    if progress["history"]:
+        lines.append(f"Recent {period}s with logs:")
+        lines.append(encode_rows([row._mapping for row in progress["history"]]))
+    return "\n".join(lines)
+
+
+async def get_goal_progress(reasoning: str, goal_id: int, period: str = "week", periods: int = 4):
+    log_tool_execution(
+        logger=logger,
+        tool_name="get_goal_progress",
+        reasoning=reasoning,
+        goal_id=goal_id,
+        period=period,
+        periods=periods
+    )
+    if period not in PERIODS:
+        return {"success": False, "message": f"period must be one of: {', '.join(PERIODS)}"}
+    progress = await load_goal_progress(goal_id, period, max(1, min(periods, 52)))
+    if progress is None:
+        return {"success": False, "message": f"Goal {goal_id} not found"}
+    return format_goal_progress(progress, period)
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Mapping, Sequence
+
+# Opt-in: when above 0, longer cells (usually Text columns such as
+# descriptions) are cut to this many characters. Lossy, so off by default.
+SQL_RESULT_MAX_CELL_CHARS = int(os.getenv("SQL_RESULT_MAX_CELL_CHARS", "0"))
+
+
+def encode_value(value: Any, max_chars: int = SQL_RESULT_MAX_CELL_CHARS) -> str:
+    """Render one cell compactly: NULL as empty, timestamps without microseconds, JSON without spaces."""
+    kind = type(value)
+    # Plain strings and numbers are most cells, so they skip the checks below
+    if kind is str:
+        return value if len(value) <= max_chars or max_chars <= 0 else _truncate(value, max_chars)
+    if kind is int or kind is float:
+        return str(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        if value.tzinfo is None and not (value.hour or value.minute or value.second or value.microsecond):
+            return value.date().isoformat()
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # Fixed notation, so Decimal("1E+1") reads as 10
+        return format(value.normalize(), "f")
+    if isinstance(value, (dict, list)):
+        text = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+    else:
+        text = str(value)
+    if 0 < max_chars < len(text):
+        return _truncate(text, max_chars)
+    return text
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    return f"{text[:max_chars]}…(+{len(text) - max_chars} chars)"
+
+
+def encode_rows(rows: Sequence[Mapping[str, Any]], max_chars: int = SQL_RESULT_MAX_CELL_CHARS) -> str:
+    """
+    Encode result rows as CSV with a single header row.
+
+    Args:
+        rows: Mappings sharing the same keys, e.g. result.mappings().all()
+        max_chars: Truncate cells longer than this; 0 keeps them whole
+
+    Returns:
+        str: Header line followed by one line per row
+    """
+    if not rows:
+        return "Empty result set"
+    columns: List[str] = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    # Values are taken by position so duplicate column names from joins survive
+    writer.writerows([encode_value(value, max_chars) for value in row.values()] for row in rows)
+    return buffer.getvalue().rstrip("\n")
@@ -1,80 +1,236 @@
 import json
+import os
 import re
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Tuple, Union
 
-from sqlalchemy import JSON, DateTime, text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import JSON, DateTime, Table, TextClause, text
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
-from app.db.database import Base, get_db
+from app.core.metrics import SQL_QUERY_CACHE_LOOKUPS
+from app.db.database import Base
+from app.db.query_cache import (commit_writes, normalize_sql, query_cache,
+                                referenced_tables)
+from app.db.unit_of_work import (current_unit_of_work, savepoint,
+                                 use_read_session, use_session)
 
+from .result_encoder import encode_rows, encode_value
 from .tool_logging import log_tool_execution, setup_tool_logger
 
 # Set up logger for this tool
 logger = setup_tool_logger("sql")
 
-def _extract_table_name(sql_statement: str, operation: str):
-    patterns = {
-        "INSERT": r"INSERT\s+INTO\s+(\w+)",
-        "UPDATE": r"UPDATE\s+(\w+)",
-        "DELETE": r"DELETE\s+FROM\s+(\w+)"
-    }
-    match = re.search(patterns[operation], sql_statement, re.IGNORECASE)
+# Guardrails for model-written SELECTs: each statement is cancelled after
+# SQL_STATEMENT_TIMEOUT_MS, at most SQL_QUERY_MAX_ROWS rows are returned, and
+# when SQL_MAX_QUERY_COST is set, plans estimated above it are refused unrun.
+SQL_STATEMENT_TIMEOUT_MS = int(os.getenv("SQL_STATEMENT_TIMEOUT_MS", "5000"))
+SQL_QUERY_MAX_ROWS = int(os.getenv("SQL_QUERY_MAX_ROWS", "200"))
+SQL_MAX_QUERY_COST = float(os.getenv("SQL_MAX_QUERY_COST", "0"))
+# Rows past the cap are counted only up to this many, so the count stays cheap
+SQL_QUERY_COUNT_LIMIT = int(os.getenv("SQL_QUERY_COUNT_LIMIT", "1000"))
+
+SQL_BATCH_MAX_STATEMENTS = int(os.getenv("SQL_BATCH_MAX_STATEMENTS", "20"))
+
+_STEP_REFERENCE = re.compile(r"^\$(\d+)\.(\w+)$")
+_ROW_RETURNING_QUERY = re.compile(r"^\s*(SELECT|WITH|VALUES|TABLE)\b", re.IGNORECASE)
+
+_TARGET_TABLE = {
+    "INSERT": re.compile(r"INSERT\s+INTO\s+(\w+)", re.IGNORECASE),
+    "UPDATE": re.compile(r"UPDATE\s+(\w+)", re.IGNORECASE),
+    "DELETE": re.compile(r"DELETE\s+FROM\s+(\w+)", re.IGNORECASE),
+}
+
+
+_INSERT_VALUES = re.compile(r"INSERT\s+INTO\s+\w+\s*\(([^)]*)\)\s*VALUES\s*\(([^)]*)\)", re.IGNORECASE)
+_COMPARED_PARAMETER = re.compile(r"(\w+)\s*(?:=|<>|!=|<=|>=|<|>)\s*:(\w+)")
+_PARAMETER = re.compile(r"^:(\w+)")
+
+
+class ParsedStatement(NamedTuple):
+    operation: str
+    table: Table
+    parameters: FrozenSet[str]
+    clause: TextClause
+    # Bind parameters whose values need converting for their column, with the converter
+    coercions: Tuple[Tuple[str, Callable[[Any], Any]], ...]
+
+
+@lru_cache(maxsize=256)
+def _parse_statement(sql_statement: str, operation: str) -> ParsedStatement:
+    """
+    Parse a write statement once: its target table, bind parameter names and text() clause.
+
+    Raises:
+        ValueError: If the table cannot be determined or is not a mapped table
+    """
+    match = _TARGET_TABLE[operation].search(sql_statement)
     if not match:
-        return {"success": False, "message": f"Could not determine table from {operation} statement"}
-    
-    table_name = match.group(1)
-    table = Base.metadata.tables.get(table_name)
-    return table
-
-def _process_data_values(table, values: list[dict]):
-    datetime_columns = [col.name for col in table.columns if isinstance(col.type, DateTime)]
+        raise ValueError(f"Could not determine table from {operation} statement")
+    table = Base.metadata.tables.get(match.group(1))
+    if table is None:
+        raise ValueError(f"Unknown table: {match.group(1)}")
+    clause = text(sql_statement)
+    # Compiling lists the bind names exactly as text() will bind them
+    parameters = frozenset(clause.compile().params)
+    converters = _column_coercions(table.name)
+    columns = _parameter_columns(sql_statement)
+    coercions = tuple(
+        (parameter, converters[columns.get(parameter, parameter)])
+        for parameter in sorted(parameters)
+        if columns.get(parameter, parameter) in converters
+    )
+    return ParsedStatement(operation, table, parameters, clause, coercions)
+
+
+def _parameter_columns(sql_statement: str) -> Dict[str, str]:
+    """
+    Map bind parameters to the column they are written to or compared with.
+
+    Covers INSERT column lists matched to a VALUES list of plain parameters
+    and `column <op> :parameter` in SET and WHERE clauses. Parameters not
+    found here are assumed to be named after their column.
+    """
+    columns = {parameter: column for column, parameter in _COMPARED_PARAMETER.findall(sql_statement)}
+    match = _INSERT_VALUES.search(sql_statement)
+    if match:
+        names = [name.strip().strip('"') for name in match.group(1).split(",")]
+        for column, value in zip(names, match.group(2).split(",")):
+            parameter = _PARAMETER.match(value.strip())
+            if parameter:
+                columns[parameter.group(1)] = column
+    return columns
+
+
+def _coerce_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _coerce_json(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+@lru_cache(maxsize=None)
+def _column_coercions(table_name: str) -> Dict[str, Callable[[Any], Any]]:
+    """Columns of a table whose values need converting before binding, with their converters."""
+    coercions = {}
+    for col in Base.metadata.tables[table_name].columns:
+        if isinstance(col.type, DateTime):
+            coercions[col.name] = _coerce_datetime
+        elif isinstance(col.type, JSON):
+            coercions[col.name] = _coerce_json
+    return coercions
+
+
+def _process_data_values(statement: ParsedStatement, values: Union[dict, list[dict]]):
     processed_values = []
-    
+    # The tool schemas send a list holding one dict for updates, a bare dict for deletes
+    if isinstance(values, dict):
+        values = [values]
+
     for value_set in values:
-        processed = value_set.copy()
-        for col in datetime_columns:
-            if col in processed and isinstance(processed[col], str):
-                try:
-                    processed[col] = datetime.fromisoformat(processed[col]) if 'T' in processed[col] \
-                        else datetime.strptime(processed[col], "%Y-%m-%d")
-                except ValueError as e:
-                    return {"success": False, "message": f"Invalid datetime format for {col}: {str(e)}"}
-        
-        for col in table.columns:
-            if isinstance(col.type, JSON) and col.name in processed:
-                if isinstance(processed[col.name], (dict, list)):
-                    processed[col.name] = json.dumps(processed[col.name])
-        
+        if value_set.keys() != statement.parameters:
+            missing = sorted(statement.parameters - value_set.keys())
+            unexpected = sorted(value_set.keys() - statement.parameters)
+            return {
+                "success": False,
+                "message": f"Values do not match the statement parameters "
+                           f"(missing: {', '.join(missing) or 'none'}; unexpected: {', '.join(unexpected) or 'none'})"
+            }
+
+        processed = value_set
+        for parameter, coerce in statement.coercions:
+            try:
+                coerced = coerce(value_set[parameter])
+            except ValueError as e:
+                return {"success": False, "message": f"Invalid value for {parameter}: {str(e)}"}
+            if coerced is not value_set[parameter]:
+                # Copy only the value sets that actually change
+                if processed is value_set:
+                    processed = dict(value_set)
+                processed[parameter] = coerced
+
         processed_values.append(processed)
-    
+
     return processed_values
 
-async def _execute_sql_statement(db, sql_statement, parameters):
+def _bind_values(processed_values: list[dict]):
+    return processed_values[0] if len(processed_values) == 1 else processed_values
+
+
+async def _execute_sql_statement(db, statement: ParsedStatement, parameters):
+    table = statement.table
     try:
-        await db.execute(text(sql_statement), parameters)
-        await db.commit()
+        async with savepoint(db):
+            await db.execute(statement.clause, parameters)
+        await commit_writes(db, {table.name})
         return {"success": True, "message": "Operation completed successfully"}
     except SQLAlchemyError as e:
         logger.error(f"[DH] Error executing SQL statement: {str(e)}")
-        await db.rollback()
         return {"success": False, "message": f"Database error: {str(e)}"}
 
 def format_query_result(result) -> str:
     if result is None:
         return "No results"
-    
-    if not result:
-        return "Empty result set"
-    
-    formatted_rows = []
-    for i, row in enumerate(result, 1):
-        if isinstance(row, dict):
-            row_str = ", ".join([f"{k}: {v}" for k, v in row.items()])
-        else:
-            row_str = str(row)
-        formatted_rows.append(f"Row {i}: {row_str}")
-    
-    return "\n".join(formatted_rows)
+    return encode_rows(result)
+
+def _strip_statement(query_string: str) -> str:
+    return query_string.strip().rstrip(";").strip()
+
+
+def _subquery(statement: str, alias: str) -> str:
+    # The newline ends a trailing -- comment before it can swallow the closing paren
+    return f"({statement}\n) AS {alias}"
+
+
+def _limited_query(query_string: str, max_rows: int) -> str:
+    """Wrap a row-returning statement so it yields at most max_rows + 1 rows."""
+    statement = _strip_statement(query_string)
+    if max_rows <= 0 or not _ROW_RETURNING_QUERY.match(statement):
+        return statement
+    # One extra row tells a truncated result apart from one of exactly max_rows
+    return f"SELECT * FROM {_subquery(statement, 'limited_query')} LIMIT {max_rows + 1}"
+
+
+def _bounded_count_query(query_string: str, limit: int) -> str:
+    """Count the rows of a statement, stopping once limit rows were seen."""
+    statement = _strip_statement(query_string)
+    return f"SELECT count(*) FROM (SELECT 1 FROM {_subquery(statement, 'counted_query')} LIMIT {limit}) AS bounded"
+
+
+def _is_statement_timeout(error: DBAPIError) -> bool:
+    return "statement timeout" in str(error.orig).lower()
+
+
+@asynccontextmanager
+async def _guarded_read(db):
+    """
+    Run the statements of one query tool call under a local statement_timeout.
+
+    Inside a turn the call runs in a savepoint that is always rolled back, so
+    neither the timeout nor a failed statement outlives the call; other
+    sessions are discarded with their transaction.
+    """
+    uow = current_unit_of_work()
+    nested = await db.begin_nested() if uow is not None and uow.session is db else None
+    try:
+        if SQL_STATEMENT_TIMEOUT_MS > 0:
+            await db.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": str(SQL_STATEMENT_TIMEOUT_MS)}
+            )
+        yield
+    finally:
+        if nested is not None:
+            await nested.rollback()
+
+
+async def _estimated_cost(db, statement: str) -> float:
+    raw = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}"))).scalar()
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    return float(plan[0]["Plan"]["Total Cost"])
+
 
 async def query(reasoning: str, query_string: str):
     log_tool_execution(
@@ -83,10 +239,76 @@ async def query(reasoning: str, query_string: str):
         reasoning=reasoning,
         query=query_string
     )
-    async with get_db() as db:
-        result = await db.execute(text(query_string))
-        rows = result.mappings().all()
-        return format_query_result(rows)
+    uow = current_unit_of_work()
+    normalized = normalize_sql(query_string)
+    tables = referenced_tables(normalized)
+    # A turn that has written reads its own uncommitted rows, which the cache must neither serve nor keep
+    cacheable = tables is not None and query_cache.usable and (uow is None or not uow.has_written)
+    if not cacheable:
+        SQL_QUERY_CACHE_LOOKUPS.labels(result="bypass").inc()
+        return await _run_query(query_string)
+
+    key = query_cache.key(normalized)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached
+    generations = query_cache.generations(tables)
+    result = await _run_query(query_string)
+    if isinstance(result, str):
+        query_cache.put(key, result, tables, generations)
+    return result
+
+
+async def _run_query(query_string: str):
+    statement = _limited_query(query_string, SQL_QUERY_MAX_ROWS)
+    async with use_read_session() as db:
+        async with _guarded_read(db):
+            try:
+                if SQL_MAX_QUERY_COST > 0:
+                    cost = await _estimated_cost(db, statement)
+                    if cost > SQL_MAX_QUERY_COST:
+                        log_tool_execution(
+                            logger=logger,
+                            tool_name="sql_query",
+                            reasoning="Query rejected by cost ceiling",
+                            status="error",
+                            estimated_cost=cost
+                        )
+                        return {
+                            "success": False,
+                            "message": f"Query rejected: estimated cost {cost:.0f} exceeds the limit of "
+                                       f"{SQL_MAX_QUERY_COST:.0f}. Add selective filters or aggregate in SQL."
+                        }
+
+                result = await db.execute(text(statement))
+                rows = result.mappings().all()
+            except DBAPIError as e:
+                if not _is_statement_timeout(e):
+                    raise
+                return {
+                    "success": False,
+                    "message": f"Query cancelled after {SQL_STATEMENT_TIMEOUT_MS} ms. "
+                               "Add selective filters, a LIMIT, or aggregate in SQL."
+                }
+
+            if SQL_QUERY_MAX_ROWS <= 0 or len(rows) <= SQL_QUERY_MAX_ROWS:
+                return format_query_result(rows)
+
+            rows = rows[:SQL_QUERY_MAX_ROWS]
+            remaining = "more rows"
+            count_limit = max(SQL_QUERY_COUNT_LIMIT, SQL_QUERY_MAX_ROWS + 1)
+            try:
+                # Bounded, so a huge result does not cost a second full scan
+                total = (await db.execute(text(_bounded_count_query(query_string, count_limit)))).scalar()
+                if total is not None:
+                    qualifier = "at least " if total >= count_limit else ""
+                    remaining = f"{qualifier}{total - SQL_QUERY_MAX_ROWS} more rows"
+            except DBAPIError:
+                pass
+            return (
+                f"{format_query_result(rows)}\n"
+                f"... truncated, {remaining} not shown. Add filters or aggregate in SQL to narrow the result."
+            )
 
 async def insert(reasoning: str, insert_statement: str, values: list[dict]):
     log_tool_execution(
@@ -97,16 +319,17 @@ async def insert(reasoning: str, insert_statement: str, values: list[dict]):
         values=values
     )
     try:
-        table = _extract_table_name(insert_statement, "INSERT")
-        if isinstance(table, dict):
-            return table
-        
-        processed_values = _process_data_values(table, values)
+        try:
+            statement = _parse_statement(insert_statement, "INSERT")
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+
+        processed_values = _process_data_values(statement, values)
         if isinstance(processed_values, dict):
             return processed_values
         
-        async with get_db() as db:
-            result = await _execute_sql_statement(db, insert_statement, processed_values)
+        async with use_session() as db:
+            result = await _execute_sql_statement(db, statement, processed_values)
             log_tool_execution(
                 logger=logger,
                 tool_name="sql_insert",
@@ -134,16 +357,17 @@ async def update(reasoning: str, update_statement: str, values: dict):
             statement=update_statement,
             values=values
         )
-        table = _extract_table_name(update_statement, "UPDATE")
-        if isinstance(table, dict):
-            return table
-        
-        processed_values = _process_data_values(table, [values])
+        try:
+            statement = _parse_statement(update_statement, "UPDATE")
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+
+        processed_values = _process_data_values(statement, values)
         if isinstance(processed_values, dict):
             return processed_values
         
-        async with get_db() as db:
-            result = await _execute_sql_statement(db, update_statement, processed_values[0])
+        async with use_session() as db:
+            result = await _execute_sql_statement(db, statement, _bind_values(processed_values))
             log_tool_execution(
                 logger=logger,
                 tool_name="sql_update",
@@ -171,16 +395,17 @@ async def delete(reasoning: str, delete_statement: str, values: dict):
             statement=delete_statement,
             values=values
         )
-        table = _extract_table_name(delete_statement, "DELETE")
-        if isinstance(table, dict):
-            return table
-        
-        processed_values = _process_data_values(table, [values])
+        try:
+            statement = _parse_statement(delete_statement, "DELETE")
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+
+        processed_values = _process_data_values(statement, values)
         if isinstance(processed_values, dict):
             return processed_values
         
-        async with get_db() as db:
-            result = await _execute_sql_statement(db, delete_statement, processed_values[0])
+        async with use_session() as db:
+            result = await _execute_sql_statement(db, statement, _bind_values(processed_values))
             log_tool_execution(
                 logger=logger,
                 tool_name="sql_delete",
@@ -199,6 +424,123 @@ async def delete(reasoning: str, delete_statement: str, values: dict):
         )
         return {"success": False, "message": f"Unexpected error: {str(e)}"}
 
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return encode_value(value, max_chars=0)
+
+
+def _resolve_references(values: dict, results: list[dict]) -> dict:
+    """
+    Replace "$<step>.<column>" values with that column of the step's first RETURNING row.
+
+    Raises:
+        ValueError: If the step has not run yet, returned no rows or lacks the column
+    """
+    resolved = {}
+    for name, value in values.items():
+        match = _STEP_REFERENCE.match(value) if isinstance(value, str) else None
+        if match is None:
+            resolved[name] = value
+            continue
+        step, column = int(match.group(1)), match.group(2)
+        if step >= len(results):
+            raise ValueError(f"{value} refers to a statement that has not run yet")
+        returning = results[step]["returning"]
+        if not returning or column not in returning[0]:
+            raise ValueError(f"{value}: statement {step} returned no {column} column; add RETURNING {column}")
+        resolved[name] = returning[0][column]
+    return resolved
+
+
+async def batch(reasoning: str, statements: list[dict]):
+    """
+    Run several INSERT, UPDATE and DELETE statements in order, all or nothing.
+
+    Args:
+        reasoning: Why the tool was called
+        statements: Items with a "statement" and the "values" for its parameters;
+            a value of "$<step>.<column>" takes that column from the first row an
+            earlier statement RETURNed
+
+    Returns:
+        dict: success, and either per-statement results or the failing step and error
+    """
+    log_tool_execution(
+        logger=logger,
+        tool_name="sql_batch",
+        reasoning=reasoning,
+        statements=statements
+    )
+    if not statements:
+        return {"success": False, "message": "No statements given"}
+    if len(statements) > SQL_BATCH_MAX_STATEMENTS:
+        return {"success": False, "message": f"At most {SQL_BATCH_MAX_STATEMENTS} statements can be batched"}
+
+    results: list[dict] = []
+    tables: set[str] = set()
+    step = 0
+    try:
+        async with use_session() as db:
+            try:
+                # Outside a turn the session is discarded on failure, which rolls the batch back
+                async with savepoint(db):
+                    for step, item in enumerate(statements):
+                        sql_statement = item.get("statement", "")
+                        operation = sql_statement.lstrip().split(None, 1)[0].upper() if sql_statement.strip() else ""
+                        if operation not in _TARGET_TABLE:
+                            raise ValueError("Only INSERT, UPDATE and DELETE statements can be batched")
+                        statement = _parse_statement(sql_statement, operation)
+                        values = _resolve_references(item.get("values") or {}, results)
+                        processed_values = _process_data_values(statement, values)
+                        if isinstance(processed_values, dict):
+                            raise ValueError(processed_values["message"])
+
+                        result = await db.execute(statement.clause, processed_values[0])
+                        returning = (
+                            [{k: _jsonable(v) for k, v in row.items()} for row in result.mappings().all()]
+                            if result.returns_rows else []
+                        )
+                        results.append({
+                            "statement": step,
+                            "rowcount": len(returning) if result.returns_rows else result.rowcount,
+                            "returning": returning,
+                        })
+                        tables.add(statement.table.name)
+            except (ValueError, SQLAlchemyError) as e:
+                log_tool_execution(
+                    logger=logger,
+                    tool_name="sql_batch",
+                    reasoning="Batch rolled back",
+                    status="error",
+                    failed_statement=step,
+                    error_message=str(e)
+                )
+                return {
+                    "success": False,
+                    "message": f"Statement {step} failed, no statement was applied: {str(e)}",
+                    "failed_statement": step,
+                }
+            await commit_writes(db, tables)
+    except Exception as e:
+        log_tool_execution(
+            logger=logger,
+            tool_name="sql_batch",
+            reasoning="Exception during batch",
+            status="error",
+            error_message=str(e)
+        )
+        return {"success": False, "message": f"Unexpected error: {str(e)}"}
+
+    log_tool_execution(
+        logger=logger,
+        tool_name="sql_batch",
+        reasoning="Batch completed",
+        status="success",
+        statements=len(results)
+    )
+    return {"success": True, "results": results}
+
 def get_schema_info():
     schema_info = {}
     for table_name, table in Base.metadata.tables.items():
@@ -0,0 +1,42 @@
+from typing import Any, List, Optional
+
+from app.db.repository import TaskRepository
+from app.db.unit_of_work import use_read_session
+
+from .tool_logging import log_tool_execution, setup_tool_logger
+
+# Set up logger for this tool
+logger = setup_tool_logger("task_tree")
+
+
+def format_task_tree(rows: List[Any]) -> str:
+    if not rows:
+        return "No tasks found"
+
+    lines = []
+    for row in rows:
+        details = [f"id {row.task_id}", row.priority or "no priority"]
+        if row.due_date is not None:
+            details.append(f"due {row.due_date.date().isoformat()}")
+        lines.append(f"{'  ' * row.depth}- [{row.status}] {row.title} ({', '.join(details)})")
+    return "\n".join(lines)
+
+
+async def get_task_tree(reasoning: str, task_id: Optional[int] = None, project_id: Optional[int] = None):
+    log_tool_execution(
+        logger=logger,
+        tool_name="get_task_tree",
+        reasoning=reasoning,
+        task_id=task_id,
+        project_id=project_id
+    )
+    if (task_id is None) == (project_id is None):
+        return {"success": False, "message": "Provide exactly one of task_id or project_id"}
+
+    async with use_read_session() as db:
+        repository = TaskRepository(db)
+        if task_id is not None:
+            rows = await repository.get_task_tree(task_id)
+        else:
+            rows = await repository.get_project_tree(project_id)
+    return format_task_tree(rows)
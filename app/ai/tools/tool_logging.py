@@ -1,4 +1,3 @@
-import json
 import logging
 from typing import Any
 
@@ -6,39 +5,37 @@ from typing import Any
 def setup_tool_logger(tool_name: str) -> logging.Logger:
     """
     Set up a logger for a specific tool.
-    
+
+    Records propagate to the root queue handler configured in
+    app.core.logging_config, so no handler is attached here.
+
     Args:
         tool_name (str): Name of the tool
-        
+
     Returns:
         logging.Logger: Configured logger for the tool
     """
     logger = logging.getLogger(f"tool.{tool_name}")
     logger.setLevel(logging.INFO)
-    
-    # Only add handler if the logger doesn't already have one
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    
     return logger
 
 def log_tool_execution(logger: logging.Logger, tool_name: str, reasoning: str, **kwargs: Any) -> None:
     """
-    Log tool execution information in a consistent JSON format.
-    
+    Log tool execution information as a structured record.
+
+    Field values are truncated by the logging pipeline, so large statements or
+    value lists are never serialized in full on the event loop.
+
     Args:
         logger (logging.Logger): The logger to use
         tool_name (str): Name of the tool being executed
         reasoning (str): Reason for tool execution
         **kwargs: Additional key-value pairs to include in the log
     """
-    log_data = {
-        "tool": tool_name,
-        "reasoning": reasoning,
-        **kwargs
-    }
-    logger.info(f"[DH] Tool Execution: {json.dumps(log_data, default=str)}") 
\ No newline at end of file
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "[DH] Tool Execution: %s",
+        tool_name,
+        extra={"fields": {"tool": tool_name, "reasoning": reasoning, **kwargs}}
+    )
@@ -1,13 +1,18 @@
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from app.services.usage_service import usage_recorder
+
 load_dotenv()
 
+TRANSCRIPTION_MODEL = "whisper-1"
+
 logger = logging.getLogger(__name__)
 
 async def transcribe_audio(audio_file_path: str | Path) -> Optional[str]:
@@ -30,11 +35,18 @@ async def transcribe_audio(audio_file_path: str | Path) -> Optional[str]:
         
         try:
             logger.info("Sending audio file to OpenAI Whisper API for transcription")
+            started = time.perf_counter()
             with open(audio_file_path, 'rb') as audio_file:
                 transcription = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file
+                    model=TRANSCRIPTION_MODEL,
+                    file=audio_file,
+                    response_format="verbose_json"
                 )
+            usage_recorder.record_transcription(
+                model=TRANSCRIPTION_MODEL,
+                latency=time.perf_counter() - started,
+                audio_seconds=getattr(transcription, "duration", None)
+            )
             logger.info("Successfully received transcription from Whisper API")
             return transcription.text
         except Exception as e:
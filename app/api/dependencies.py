@@ -1,3 +1,5 @@
+import os
+
 from app.controller.chatbot_controller import ChatbotController
 
-chatbot_controller = ChatbotController(memory_type="remote") 
+chatbot_controller = ChatbotController(memory_type=os.getenv("CHAT_MEMORY_TYPE", "remote")) 
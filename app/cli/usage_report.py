@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from app.db.database import engine, get_db
+from app.db.repository.ai_interaction_repository import AIInteractionRepository
+from app.services.usage_service import chat_cost
+
+
+def _print_table(title: str, rows: Iterable[dict], columns: List[str]) -> None:
+    rows = [dict(row) for row in rows]
+    print(f"\n== {title} ==")
+    if not rows:
+        print("No usage recorded")
+        return
+    rendered = [[_format(row.get(col)) for col in columns] for row in rows]
+    widths = [max(len(col), *(len(r[i]) for r in rendered)) for i, col in enumerate(columns)]
+    print("  ".join(col.ljust(widths[i]) for i, col in enumerate(columns)))
+    for r in rendered:
+        print("  ".join(value.ljust(widths[i]) for i, value in enumerate(r)))
+
+
+def _format(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, Decimal):
+        return f"{value:.4f}" if value % 1 else f"{value:.0f}"
+    return str(value)
+
+
+async def _section_breakdown(rows) -> List[dict]:
+    """Split each call's prompt tokens and input cost across its prompt sections."""
+    totals: Dict[str, Dict[str, Decimal]] = {}
+    async for model, prompt_tokens, cached_tokens, sections in rows:
+        estimated = sum(sections.values()) or 1
+        input_cost = chat_cost(model, prompt_tokens or 0, cached_tokens or 0, 0) or Decimal(0)
+        for name, tokens in sections.items():
+            share = Decimal(tokens) / Decimal(estimated)
+            entry = totals.setdefault(name, {"prompt_tokens": Decimal(0), "input_cost_usd": Decimal(0)})
+            entry["prompt_tokens"] += share * (prompt_tokens or 0)
+            entry["input_cost_usd"] += share * input_cost
+    return sorted(
+        ({"section": name, "prompt_tokens": v["prompt_tokens"].quantize(Decimal(1)),
+          "input_cost_usd": v["input_cost_usd"]} for name, v in totals.items()),
+        key=lambda row: row["input_cost_usd"],
+        reverse=True,
+    )
+
+
+async def report(days: Optional[int]) -> None:
+    since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+    async with get_db() as db:
+        repository = AIInteractionRepository(db)
+        _print_table(
+            "Cost by session",
+            await repository.cost_by_session(since),
+            ["session_id", "turns", "calls", "prompt_tokens", "cached_tokens",
+             "completion_tokens", "reasoning_tokens", "cost_usd"],
+        )
+        _print_table(
+            "Cost by tool usage",
+            await repository.cost_by_tool(since),
+            ["tool", "calls", "prompt_tokens", "completion_tokens", "cost_usd"],
+        )
+        _print_table(
+            "Input cost by prompt section (estimated split)",
+            await _section_breakdown(repository.get_prompt_section_usage(since)),
+            ["section", "prompt_tokens", "input_cost_usd"],
+        )
+    await engine.dispose()
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Break down LLM token usage and cost")
+    parser.add_argument("--days", type=int, default=None, help="Only include the last N days")
+    args = parser.parse_args()
+    asyncio.run(report(args.days))
+
+
+if __name__ == "__main__":
+    run()
@@ -1,10 +1,14 @@
 import logging
 
 from fastapi import HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import metrics
+from app.core.loop_monitor import get_loop_monitor
+from app.core.profiling import new_turn_id, profile_turn
+from app.core.turn_context import turn_context
+from app.db.unit_of_work import UnitOfWork, unit_of_work
 from app.services.agent_service import AgentService
-from app.services.memory_service import MemoryService
+from app.services.memory_service import DEFAULT_SESSION_ID, MemoryService
 from app.services.message_service import MessageService
 
 logger = logging.getLogger(__name__)
@@ -19,13 +23,13 @@ class ChatbotController:
         self.message_service = MessageService()
         self.agent_service = AgentService()
 
-    async def handle_webhook_data(self, body: dict, db: AsyncSession) -> dict:
+    async def handle_webhook_data(self, body: dict, profile: bool = False) -> dict:
         """
         Handle incoming webhook data and process messages.
         
         Args:
             body: Webhook request body
-            db: Database session for memory operations
+            profile: Whether the caller explicitly asked for this turn to be profiled
             
         Returns:
             dict: Response indicating message processing status
@@ -33,6 +37,15 @@ class ChatbotController:
         Raises:
             HTTPException: For invalid data or processing errors
         """
+        metrics.WEBHOOKS_RECEIVED.inc()
+        turn_id = new_turn_id(((body.get('data') or {}).get('key') or {}).get('id'))
+        with turn_context(turn_id, DEFAULT_SESSION_ID), metrics.TURNS_IN_FLIGHT.track_inprogress(), \
+                metrics.observe_latency(metrics.TURN_LATENCY):
+            async with get_loop_monitor().track_turn(turn_id), profile_turn(turn_id, requested=profile):
+                return await self._handle_webhook_data(body)
+
+    async def _handle_webhook_data(self, body: dict) -> dict:
+        """Validate the webhook payload and dispatch it for processing."""
         try:
             # Extract webhook data
             data = body.get('data', {})
@@ -47,30 +60,35 @@ class ChatbotController:
 
             if not self._is_valid_message(key):
                 logger.info("Message ignored - not matching target criteria")
+                metrics.WEBHOOKS_IGNORED.inc()
                 return {"message": "Message ignored"}
 
-            # Process message
-            message_sent = await self._process_message(
-                key=key,
-                message=data.get('message', {}),
-                api_key=body.get('apikey', {}),
-                db=db,
-                instance=instance
-            )
+            # Process message; memory and every SQL tool call share one session
+            async with unit_of_work() as uow:
+                message_sent = await self._process_message(
+                    key=key,
+                    message=data.get('message', {}),
+                    api_key=body.get('apikey', {}),
+                    uow=uow,
+                    instance=instance
+                )
 
+            metrics.WEBHOOKS_PROCESSED.labels(outcome="sent" if message_sent else "not_sent").inc()
             return {"message": f'message_sent: {message_sent}'}
 
         except HTTPException:
+            metrics.WEBHOOKS_PROCESSED.labels(outcome="error").inc()
             raise
         except Exception as e:
+            metrics.WEBHOOKS_PROCESSED.labels(outcome="error").inc()
             logger.error(f"Error processing webhook data: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to process webhook data")
 
-    async def _process_message(self, key: dict, message: dict, api_key: str, db: AsyncSession, instance: str) -> bool:
+    async def _process_message(self, key: dict, message: dict, api_key: str, uow: UnitOfWork, instance: str) -> bool:
         """Process incoming message and orchestrate response generation."""
         try:
             # Get memory instance
-            memory_instance = await self.memory_service.get_memory_instance(db)
+            memory_instance = await self.memory_service.get_memory_instance(uow.session)
             quoted = {"key": key, "message": message}
             
             # Extract user message
@@ -89,6 +107,9 @@ class ChatbotController:
             if not response:
                 return False
 
+            # The reply may confirm the turn's writes, so they must be durable first
+            await uow.commit()
+
             # Send response
             return await self.message_service.send_response(
                 response=response,
@@ -0,0 +1,148 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import reprlib
+from logging.handlers import (QueueHandler, QueueListener,
+                              TimedRotatingFileHandler)
+from pathlib import Path
+from typing import Any, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DIR = Path(os.getenv("LOG_DIR", "./logs"))
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "500"))
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+LOG_BACKUP_DAYS = int(os.getenv("LOG_BACKUP_DAYS", "14"))
+
+CONSOLE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_field_repr = reprlib.Repr()
+_field_repr.maxlevel = 3
+_field_repr.maxdict = 20
+_field_repr.maxlist = 20
+_field_repr.maxstring = LOG_MAX_FIELD_CHARS
+_field_repr.maxother = LOG_MAX_FIELD_CHARS
+
+_listener: Optional[QueueListener] = None
+
+
+def truncate_field(value: Any, limit: int = LOG_MAX_FIELD_CHARS) -> str:
+    """
+    Render a log field with bounded cost and size.
+
+    Strings are sliced; everything else goes through reprlib, which stops
+    walking nested containers once its limits are hit instead of serializing
+    the whole value first.
+    """
+    if not isinstance(value, str):
+        value = _field_repr.repr(value)
+    if len(value) <= limit:
+        return value
+    return f"{value[:limit]}...[{len(value) - limit} more chars]"
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep only a random sample of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float = LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Queue handler that does the minimum on the calling thread.
+
+    The message and structured fields are merged and truncated here because
+    their arguments may be mutated after the call returns; formatting and disk
+    writes happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = truncate_field(record.getMessage(), LOG_MAX_FIELD_CHARS * 4)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = {key: truncate_field(value) for key, value in fields.items()}
+        record.msg = message
+        record.message = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Human readable line with structured fields appended as JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line = f"{line} {json.dumps(fields, ensure_ascii=False)}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for the log file."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging() -> None:
+    """
+    Route all logging through a queue so the event loop never touches disk.
+
+    The root logger gets a single TruncatingQueueHandler; a QueueListener thread
+    fans records out to the console and to a file rotated at midnight.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    file_handler = TimedRotatingFileHandler(
+        LOG_DIR / "app.log", when="midnight", backupCount=LOG_BACKUP_DAYS, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(ConsoleFormatter(CONSOLE_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = TruncatingQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "1").lower() in ("1", "true", "yes")
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50")) / 1000
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")) / 1000
+# Test mode: when set, a turn that blocks the loop for longer than this
+# raises BlockingCallError instead of only being logged.
+LOOP_LAG_FAIL_MS = os.getenv("LOOP_LAG_FAIL_MS")
+
+
+class BlockingCallError(RuntimeError):
+    """Raised in test mode when a turn blocked the event loop for too long."""
+
+
+class _TurnLag:
+    def __init__(self):
+        self.max_lag = 0.0
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag and attributes long stalls to the blocking code.
+
+    A probe coroutine sleeps for a fixed interval and records how late it woke
+    up. A watchdog thread watches the probe's heartbeat; when the loop has not
+    ticked for longer than the threshold it snapshots the loop thread's stack,
+    which shows the coroutine that is holding the loop with a sync call.
+    """
+
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL, threshold: float = LOOP_LAG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = time.monotonic()
+        self._turns: Set[_TurnLag] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._probe_task is not None and not self._probe_task.done()
+
+    def start(self) -> None:
+        """Start the probe on the running loop and the watchdog thread."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._probe_task = self._loop.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started (interval={self.interval * 1000:.0f}ms, "
+                    f"threshold={self.threshold * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self._last_beat = time.monotonic()
+            metrics.EVENT_LOOP_LAG.observe(lag)
+            for turn in self._turns:
+                if lag > turn.max_lag:
+                    turn.max_lag = lag
+
+    def _watch(self) -> None:
+        reported = False
+        while not self._stop.wait(self.threshold / 2):
+            stalled_for = time.monotonic() - self._last_beat - self.interval
+            if stalled_for < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            metrics.EVENT_LOOP_BLOCKS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            logger.warning(f"Event loop blocked for more than {stalled_for * 1000:.0f}ms, "
+                           f"loop thread stack:\n{stack}")
+
+    @asynccontextmanager
+    async def track_turn(self, turn_id: str) -> AsyncIterator[None]:
+        """
+        Record the worst loop lag observed while a turn is in flight.
+
+        In test mode (LOOP_LAG_FAIL_MS set) the monitor is started on demand and
+        a turn whose worst lag exceeds the limit raises BlockingCallError.
+        """
+        fail_after = float(LOOP_LAG_FAIL_MS) / 1000 if LOOP_LAG_FAIL_MS else None
+        if fail_after is not None and not self.running:
+            self.start()
+            # Let the probe take its first reading before the turn can block
+            await asyncio.sleep(0)
+        turn = _TurnLag()
+        self._turns.add(turn)
+        try:
+            yield
+        finally:
+            if fail_after is not None:
+                # Let the probe observe a stall that ended just before the turn did
+                await asyncio.sleep(self.interval * 2)
+            self._turns.discard(turn)
+
+        if turn.max_lag >= self.threshold:
+            logger.warning(f"Turn {turn_id} saw event loop lag of {turn.max_lag * 1000:.0f}ms")
+        if fail_after is not None and turn.max_lag > fail_after:
+            raise BlockingCallError(
+                f"Turn {turn_id} blocked the event loop for {turn.max_lag * 1000:.0f}ms "
+                f"(limit {fail_after * 1000:.0f}ms)"
+            )
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """Get or create the global loop monitor instance."""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopLagMonitor()
+    return _monitor
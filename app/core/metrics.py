@@ -0,0 +1,149 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from prometheus_client import (CONTENT_TYPE_LATEST, Counter, Gauge, Histogram,
+                               generate_latest)
+
+# Buckets sized for an LLM driven pipeline: a turn can take anywhere from
+# a few hundred milliseconds to more than a minute with several tool calls.
+TURN_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+TOOL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+
+WEBHOOKS_RECEIVED = Counter(
+    "assistant_webhooks_received_total",
+    "Webhook payloads received by the controller",
+)
+WEBHOOKS_IGNORED = Counter(
+    "assistant_webhooks_ignored_total",
+    "Webhook payloads ignored because they do not match the target criteria",
+)
+WEBHOOKS_PROCESSED = Counter(
+    "assistant_webhooks_processed_total",
+    "Webhook payloads fully processed, labelled by outcome",
+    ["outcome"],
+)
+
+TURN_LATENCY = Histogram(
+    "assistant_turn_latency_seconds",
+    "End-to-end latency of a webhook turn",
+    buckets=TURN_BUCKETS,
+)
+LLM_CALL_LATENCY = Histogram(
+    "assistant_llm_call_latency_seconds",
+    "Latency of a single chat completion call",
+    ["model"],
+    buckets=LLM_BUCKETS,
+)
+TOOL_LATENCY = Histogram(
+    "assistant_tool_latency_seconds",
+    "Latency of a tool execution",
+    ["tool"],
+    buckets=TOOL_BUCKETS,
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "assistant_event_loop_lag_seconds",
+    "Delay between when the loop monitor should have woken up and when it did",
+    buckets=LOOP_LAG_BUCKETS,
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "assistant_event_loop_blocks_total",
+    "Times the event loop was blocked for longer than the lag threshold",
+)
+
+TURNS_IN_FLIGHT = Gauge(
+    "assistant_turns_in_flight",
+    "Webhook turns currently being processed",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "assistant_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "assistant_db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool, including connects",
+    buckets=POOL_WAIT_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "assistant_db_pool_checkout_timeouts_total",
+    "Pool checkouts that gave up after DB_POOL_TIMEOUT",
+)
+SQL_QUERY_CACHE_LOOKUPS = Counter(
+    "assistant_sql_query_cache_lookups_total",
+    "SQL tool query cache lookups, labelled by result (hit, miss or bypass)",
+    ["result"],
+)
+SQL_QUERY_CACHE_INVALIDATIONS = Counter(
+    "assistant_sql_query_cache_invalidations_total",
+    "Table invalidations applied to the SQL tool query cache, labelled by origin",
+    ["origin"],
+)
+SCHEDULER_JOBS = Gauge(
+    "assistant_scheduler_jobs",
+    "Jobs currently registered in the scheduler",
+)
+
+LLM_PROMPT_TOKENS = Counter(
+    "assistant_llm_prompt_tokens_total",
+    "Prompt tokens reported by the OpenAI usage object",
+    ["model"],
+)
+LLM_COMPLETION_TOKENS = Counter(
+    "assistant_llm_completion_tokens_total",
+    "Completion tokens reported by the OpenAI usage object",
+    ["model"],
+)
+LLM_CACHED_TOKENS = Counter(
+    "assistant_llm_cached_tokens_total",
+    "Cached prompt tokens reported by the OpenAI usage object",
+    ["model"],
+)
+
+
+@contextmanager
+def observe_latency(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the wall time of the wrapped block on the given histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target = histogram.labels(**labels) if labels else histogram
+        target.observe(time.perf_counter() - start)
+
+
+def record_token_usage(model: str, usage: Any) -> None:
+    """Add the token counts of an OpenAI usage object to the token counters."""
+    if usage is None:
+        return
+    LLM_PROMPT_TOKENS.labels(model=model).inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_COMPLETION_TOKENS.labels(model=model).inc(getattr(usage, "completion_tokens", 0) or 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    LLM_CACHED_TOKENS.labels(model=model).inc(cached or 0)
+
+
+def bind_runtime_gauges() -> None:
+    """Wire the gauges that are sampled lazily at scrape time.
+
+    Pool and scheduler state is read only when /metrics is scraped, so the
+    hot path pays nothing for them.
+    """
+    from app.core.scheduler import get_scheduler
+    from app.db.database import engine
+
+    DB_POOL_CHECKED_OUT.set_function(lambda: _pool_checked_out(engine))
+    SCHEDULER_JOBS.set_function(lambda: len(get_scheduler().get_jobs()))
+
+
+def _pool_checked_out(engine) -> float:
+    checkedout = getattr(engine.sync_engine.pool, "checkedout", None)
+    return float(checkedout()) if callable(checkedout) else 0.0
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Return the current exposition payload and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover - profiling is an optional extra
+    Profiler = None
+    SpeedscopeRenderer = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Turn"
+
+# PROFILE_TURNS=1 profiles every turn, PROFILE_SAMPLE_RATE profiles a random
+# fraction of them; a request can always opt in through PROFILE_HEADER.
+PROFILE_ALL = os.getenv("PROFILE_TURNS", "0").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "./profiles"))
+
+
+def should_profile(requested: bool = False) -> bool:
+    """Decide whether the current turn is profiled."""
+    if Profiler is None:
+        if requested:
+            logger.warning("Turn profiling requested but pyinstrument is not installed")
+        return False
+    if requested or PROFILE_ALL:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def new_turn_id(hint: Optional[str] = None) -> str:
+    """Build a unique, filesystem-safe turn id prefixed with the upstream message id."""
+    suffix = uuid.uuid4().hex
+    if hint:
+        safe_hint = re.sub(r"[^\w-]", "_", hint)[:55]
+        return f"{safe_hint}-{suffix[:8]}"
+    return suffix
+
+
+def _write_profile(turn_id: str, session) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"{turn_id}.speedscope.json"
+    path.write_text(SpeedscopeRenderer().render(session))
+    return path
+
+
+@asynccontextmanager
+async def profile_turn(turn_id: str, requested: bool = False) -> AsyncIterator[bool]:
+    """
+    Run the wrapped block under a sampling profiler when profiling is enabled.
+
+    The profile is written as a speedscope file (open it at speedscope.app for
+    a flamegraph) named after the turn id. The profiler runs in async mode so
+    only the awaiting task's stack is attributed, not unrelated turns.
+
+    Args:
+        turn_id: Identifier used for the profile file name
+        requested: Whether the caller explicitly asked for a profile
+
+    Yields:
+        bool: True if the turn is being profiled
+    """
+    if not should_profile(requested):
+        yield False
+        return
+
+    profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+    try:
+        profiler.start()
+    except RuntimeError as e:
+        logger.warning(f"Could not start profiler for turn {turn_id}: {str(e)}")
+        yield False
+        return
+
+    try:
+        yield True
+    finally:
+        session = profiler.stop()
+        try:
+            path = await asyncio.to_thread(_write_profile, turn_id, session)
+            logger.info(f"Turn {turn_id} profile written to {path}")
+        except Exception as e:
+            logger.error(f"Failed to write profile for turn {turn_id}: {str(e)}")
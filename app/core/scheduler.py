@@ -7,7 +7,12 @@ from zoneinfo import ZoneInfo
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
+from app.services.dashboard_service import (DASHBOARD_REFRESH_MINUTES,
+                                            refresh_dashboard)
+from app.services.goal_progress_service import (GOAL_RECONCILE_HOUR,
+                                                reconcile_goal_progress)
 from app.services.message_scheduler_service import send_scheduled_message
 
 logger = logging.getLogger(__name__)
@@ -80,6 +85,19 @@ def get_scheduler() -> AsyncIOScheduler:
             args=[four_pm_messages],
             id="webhook_4pm"
         )
+        # Keeps the get_dashboard snapshot fresh for the nudges above
+        scheduler.add_job(
+            refresh_dashboard,
+            IntervalTrigger(minutes=DASHBOARD_REFRESH_MINUTES, timezone=TIMEZONE),
+            id="refresh_dashboard",
+            next_run_time=datetime.now(TIMEZONE)
+        )
+        # Repairs any drift in the trigger-maintained goal rollups
+        scheduler.add_job(
+            reconcile_goal_progress,
+            CronTrigger(hour=GOAL_RECONCILE_HOUR, minute=30, timezone=TIMEZONE),
+            id="reconcile_goal_progress"
+        )
         
         scheduler.start()
     return scheduler
@@ -0,0 +1,3 @@
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for attribution and memory budgets."""
+    return (len(text) + 3) // 4
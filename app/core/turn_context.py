@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+current_turn_id: ContextVar[Optional[str]] = ContextVar("current_turn_id", default=None)
+current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+
+
+@contextmanager
+def turn_context(turn_id: str, session_id: Optional[str] = None) -> Iterator[None]:
+    """Expose the turn and session ids to code running inside the turn."""
+    turn_token = current_turn_id.set(turn_id)
+    session_token = current_session_id.set(session_id)
+    try:
+        yield
+    finally:
+        current_session_id.reset(session_token)
+        current_turn_id.reset(turn_token)
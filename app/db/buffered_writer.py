@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from app.db.database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedInsertWriter:
+    """
+    Buffers rows in memory and writes them in batches off the hot path.
+
+    Rows are flushed with a single multi-row INSERT either every
+    ``flush_interval`` seconds or as soon as ``batch_size`` rows are pending,
+    whichever comes first. The flush task starts lazily on the first row.
+    """
+
+    def __init__(self, model, flush_interval: float, batch_size: int):
+        self.model = model
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def record(self, row: dict) -> None:
+        """Queue a row; never blocks and never raises into the caller."""
+        self.record_many([row])
+
+    def record_many(self, rows: List[dict]) -> None:
+        self._buffer.extend(rows)
+        # Also restarts a flusher that ended, e.g. cancelled or left on a closed loop
+        if self._task is None or self._task.done():
+            try:
+                self.start()
+            except RuntimeError:
+                return  # No running loop, the rows are flushed on the next stop()
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            async with get_db() as db:
+                await db.execute(insert(self.model), rows)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist {len(rows)} {self.model.__tablename__} rows: {str(e)}")
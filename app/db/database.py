@@ -1,29 +1,180 @@
+import logging
 import os
+import time
 from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from uuid import uuid4
 
 from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
                                     create_async_engine)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import DB_POOL_CHECKOUT_TIMEOUTS, DB_POOL_CHECKOUT_WAIT
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 db_url = os.getenv("DB_URL")
 if not db_url:
     raise ValueError("DB_URL environment variable is not set")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+# Prepared statements cached per connection, by asyncpg and by SQLAlchemy's adapter
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# "auto" treats port 6432 or a host naming pgbouncer as a transaction-pooling bouncer
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "auto").lower()
+# Optional streaming replica that serves read-only queries
+DB_REPLICA_URL = os.getenv("DB_REPLICA_URL")
+# Reads go to the primary for this long after a local commit, and whenever the
+# replica reports more replay lag than this
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "2"))
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def behind_pgbouncer(url: str, setting: str = DB_PGBOUNCER) -> bool:
+    if setting in ("1", "true", "yes"):
+        return True
+    if setting in ("0", "false", "no"):
+        return False
+    parsed = make_url(url)
+    return parsed.port == 6432 or "pgbouncer" in (parsed.host or "").lower()
+
+
+def statement_cache_args(pgbouncer: bool, cache_size: int = DB_STATEMENT_CACHE_SIZE) -> Dict[str, Any]:
+    """
+    asyncpg connect arguments for prepared statement caching.
+
+    Args:
+        pgbouncer: Whether connections go through a transaction-pooling pgbouncer
+        cache_size: Statements to cache per connection when connecting directly
+
+    Returns:
+        Dict[str, Any]: connect_args for create_async_engine
+    """
+    if pgbouncer:
+        # A bouncer hands each transaction a different server connection, so
+        # named statements must be neither cached nor reused across them.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"statement_cache_size": cache_size, "prepared_statement_cache_size": cache_size}
+
+
+def build_engine(url: str, statement_cache_size: Optional[int] = None, **overrides):
+    """Create an engine from the DB_* settings; keyword overrides win."""
+    pgbouncer = behind_pgbouncer(url)
+    connect_args = statement_cache_args(
+        pgbouncer, DB_STATEMENT_CACHE_SIZE if statement_cache_size is None else statement_cache_size
+    )
+    options = dict(
+        future=True,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    options.update(overrides)
+    return create_async_engine(url, **options)
+
+
 print(f'[DH] DB_URL: {db_url}')
-engine = create_async_engine(
-    db_url,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=300,  # Recycle connections periodically
-    connect_args={"statement_cache_size": 0}  # Disable statement caching for pgbouncer compatibility
-)
+engine = build_engine(db_url)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = build_engine(DB_REPLICA_URL) if DB_REPLICA_URL else None
+replica_session = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None else None
+)
+
 Base = declarative_base()
 
+
+class ReplicaRouter:
+    """
+    Decides per read whether the replica is safe to use.
+
+    The replica is skipped for DB_REPLICA_MAX_LAG seconds after this process
+    commits, so a user never reads back stale data right after a write, and
+    while the replica's own replay lag, sampled at most every
+    DB_REPLICA_LAG_CHECK_INTERVAL seconds, exceeds that bound or cannot be read.
+    """
+
+    def __init__(self, max_lag: float = DB_REPLICA_MAX_LAG, check_interval: float = DB_REPLICA_LAG_CHECK_INTERVAL):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._last_write = float("-inf")
+        self._checked_at = float("-inf")
+        self._healthy = False
+
+    def note_write(self) -> None:
+        self._last_write = time.monotonic()
+
+    async def use_replica(self) -> bool:
+        if replica_engine is None:
+            return False
+        now = time.monotonic()
+        if now - self._last_write < self.max_lag:
+            return False
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._healthy = await self._replica_lag_ok()
+        return self._healthy
+
+    async def _replica_lag_ok(self) -> bool:
+        # Replay timestamps stop advancing when the primary is idle, so a replica
+        # that has replayed everything it received counts as having no lag.
+        # Outside recovery these functions return NULL, which also reads as 0.
+        query = text("""
+            SELECT CASE
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+            END
+        """)
+        try:
+            async with replica_engine.connect() as conn:
+                lag = (await conn.execute(query)).scalar() or 0
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from the primary: {str(e)}")
+            return False
+        if lag > self.max_lag:
+            logger.info(f"Replica is {lag:.1f}s behind, reading from the primary")
+            return False
+        return True
+
+
+replica_router = ReplicaRouter()
+
+
 @asynccontextmanager
 async def get_db():
     async with async_session() as session:
@@ -33,4 +184,20 @@ async def get_db():
             await session.rollback()
             raise e
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+@asynccontextmanager
+async def get_read_db():
+    """Session for read-only work: a READ ONLY transaction on the replica when one is usable."""
+    if replica_session is None or not await replica_router.use_replica():
+        async with get_db() as session:
+            yield session
+        return
+    async with replica_session() as session:
+        try:
+            await session.execute(text("SET TRANSACTION READ ONLY"))
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
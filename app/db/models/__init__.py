@@ -1,6 +1,11 @@
+from sqlalchemy import DDL, event
+
+from app.db.database import Base
+
 from .ai_interaction import AIInteraction
 from .chat_history import ChatHistory
 from .goal import Goal
+from .goal_progress_rollup import GoalProgressRollup
 from .procrastination_pattern import ProcrastinationPattern
 from .progress_log import ProgressLog
 from .project import Project
@@ -10,8 +15,43 @@ __all__ = [
     'Project',
     'Task',
     'Goal',
+    'GoalProgressRollup',
     'ProgressLog',
     'AIInteraction',
     'ProcrastinationPattern',
     'ChatHistory'
 ]
+
+# The trigram name indexes behind resolve_entity are optional: the database
+# role may not be allowed to install pg_trgm, and the entity resolver then
+# falls back to an in-process index. So they stay out of the table metadata
+# and create_all only tries to add them, never failing startup. Migration
+# e8b2d5f0a913 builds the same indexes concurrently.
+TRIGRAM_INDEXES = [
+    ('ix_tasks_title_trgm', 'tasks', 'title'),
+    ('ix_projects_name_trgm', 'projects', 'name'),
+    ('ix_goals_title_trgm', 'goals', 'title'),
+]
+
+_CREATE_TRIGRAM_INDEXES = "\n".join(
+    f"        CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops);"
+    for name, table, column in TRIGRAM_INDEXES
+)
+
+# Two listeners, since asyncpg prepares each DDL and a prepared statement holds one command
+event.listen(Base.metadata, "after_create", DDL("""
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'pg_trgm could not be installed, skipping the trigram name indexes';
+END $$
+"""))
+event.listen(Base.metadata, "after_create", DDL(f"""
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+{_CREATE_TRIGRAM_INDEXES}
+    END IF;
+END $$
+"""))
@@ -1,20 +1,37 @@
-from sqlalchemy import (JSON, CheckConstraint, Column, DateTime, Integer,
-                        String, Text, text)
+from sqlalchemy import (JSON, CheckConstraint, Column, DateTime, Index,
+                        Integer, Numeric, String, Text, text)
 
 from app.db.database import Base
 
 
 class AIInteraction(Base):
     __tablename__ = 'ai_interactions'
-    
+
     interaction_id = Column(Integer, primary_key=True)
-    message_text = Column(Text, nullable=False)
-    response_text = Column(Text, nullable=False)
+    message_text = Column(Text)
+    response_text = Column(Text)
     intent = Column(String(50))
     context_data = Column(JSON)
     effectiveness_rating = Column(Integer)
+    # Per-call usage accounting, one row per model call
+    session_id = Column(String(100))
+    turn_id = Column(String(64))
+    kind = Column(String(20), server_default='chat')
+    model = Column(String(50))
+    iteration = Column(Integer)
+    prompt_tokens = Column(Integer, server_default='0')
+    cached_tokens = Column(Integer, server_default='0')
+    completion_tokens = Column(Integer, server_default='0')
+    reasoning_tokens = Column(Integer, server_default='0')
+    audio_seconds = Column(Numeric)
+    latency_ms = Column(Integer)
+    tool_names = Column(JSON)
+    prompt_sections = Column(JSON)
+    cost_usd = Column(Numeric(12, 6))
     created_at = Column(DateTime(timezone=True), server_default=text('CURRENT_TIMESTAMP'))
-    
+
     __table_args__ = (
         CheckConstraint("effectiveness_rating BETWEEN 1 AND 5"),
+        CheckConstraint("kind IN ('chat', 'transcription')"),
+        Index('ix_ai_interactions_session_created', 'session_id', 'created_at'),
     )
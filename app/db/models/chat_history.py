@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, text
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, text
 from app.db.database import Base
 
 class ChatHistory(Base):
@@ -8,3 +8,7 @@ class ChatHistory(Base):
     session_id = Column(String(100), nullable=False)
     message = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=text('CURRENT_TIMESTAMP'))
+
+    __table_args__ = (
+        Index('ix_chat_history_session_id_id', 'session_id', 'id'),
+    )
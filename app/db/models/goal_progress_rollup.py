@@ -0,0 +1,141 @@
+from sqlalchemy import (DDL, CheckConstraint, Column, Date, DateTime,
+                        ForeignKey, Integer, Numeric, String, event)
+
+from app.db.database import Base
+
+# Days and weeks are cut in the scheduler's timezone. Migration b6d0f3a8c127
+# keeps a frozen copy of the SQL below; changing it here needs a new migration
+GOAL_ROLLUP_TIMEZONE = "America/Sao_Paulo"
+
+# Arbitrary key for the advisory lock taken while installing the trigger
+INSTALL_LOCK_KEY = 7_349_012_120
+
+
+class GoalProgressRollup(Base):
+    """
+    Per-goal totals of progress_logs per day and per ISO week.
+
+    Kept current by a trigger on progress_logs and rebuilt in bulk by
+    GoalProgressRepository.reconcile. The trigger comes from migration
+    b6d0f3a8c127, or from create_all through the listener below.
+    """
+    __tablename__ = 'goal_progress_rollups'
+
+    goal_id = Column(Integer, ForeignKey('goals.goal_id', ondelete='CASCADE'), primary_key=True)
+    period = Column(String(10), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    total = Column(Numeric, nullable=False, server_default='0')
+    entries = Column(Integer, nullable=False, server_default='0')
+    last_logged_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint("period IN ('day', 'week')"),
+    )
+
+
+# A goal's current_value is the sum of its logged values as soon as it has
+# one; goals without any valued log keep the value they were given by hand.
+# The trigger, the backfill and the nightly reconciliation all apply this.
+SYNC_GOAL_CURRENT_VALUES = """
+UPDATE goals AS g SET current_value = totals.total
+FROM (
+    SELECT related_goal_id, sum(value) AS total
+    FROM progress_logs
+    WHERE related_goal_id IS NOT NULL AND value IS NOT NULL
+    GROUP BY related_goal_id
+) AS totals
+WHERE g.goal_id = totals.related_goal_id AND g.current_value IS DISTINCT FROM totals.total
+"""
+
+REBUILD_GOAL_ROLLUPS = f"""
+INSERT INTO goal_progress_rollups (goal_id, period, period_start, total, entries, last_logged_at)
+SELECT related_goal_id, period, period_start, coalesce(sum(value), 0), count(*), max(created_at)
+FROM (
+    SELECT related_goal_id, value, created_at, 'day' AS period,
+           (created_at AT TIME ZONE '{GOAL_ROLLUP_TIMEZONE}')::date AS period_start
+    FROM progress_logs WHERE related_goal_id IS NOT NULL
+    UNION ALL
+    SELECT related_goal_id, value, created_at, 'week',
+           date_trunc('week', created_at AT TIME ZONE '{GOAL_ROLLUP_TIMEZONE}')::date
+    FROM progress_logs WHERE related_goal_id IS NOT NULL
+) AS logs
+GROUP BY related_goal_id, period, period_start
+"""
+
+APPLY_GOAL_PROGRESS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION apply_goal_progress(goal integer, logged_at timestamptz, amount numeric, delta integer)
+RETURNS void AS $fn$
+DECLARE
+    local_time timestamp := logged_at AT TIME ZONE '{GOAL_ROLLUP_TIMEZONE}';
+BEGIN
+    INSERT INTO goal_progress_rollups AS r (goal_id, period, period_start, total, entries, last_logged_at)
+    VALUES (goal, 'day', local_time::date, coalesce(amount, 0), delta, logged_at),
+           (goal, 'week', date_trunc('week', local_time)::date, coalesce(amount, 0), delta, logged_at)
+    ON CONFLICT (goal_id, period, period_start) DO UPDATE
+        SET total = r.total + EXCLUDED.total,
+            entries = r.entries + EXCLUDED.entries,
+            -- Removals leave it alone; reconciliation corrects it
+            last_logged_at = CASE WHEN EXCLUDED.entries > 0
+                                  THEN greatest(r.last_logged_at, EXCLUDED.last_logged_at)
+                                  ELSE r.last_logged_at END;
+    -- Same rule as SYNC_GOAL_CURRENT_VALUES, for the one goal
+    IF amount IS NOT NULL THEN
+        UPDATE goals AS g SET current_value = totals.total
+        FROM (
+            SELECT sum(value) AS total FROM progress_logs
+            WHERE related_goal_id = goal AND value IS NOT NULL
+        ) AS totals
+        WHERE g.goal_id = goal AND totals.total IS NOT NULL
+          AND g.current_value IS DISTINCT FROM totals.total;
+    END IF;
+END
+$fn$ LANGUAGE plpgsql
+"""
+
+PROGRESS_LOGS_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION progress_logs_goal_rollup()
+RETURNS trigger AS $fn$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.related_goal_id IS NOT NULL THEN
+        PERFORM apply_goal_progress(OLD.related_goal_id, OLD.created_at, -OLD.value, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.related_goal_id IS NOT NULL THEN
+        PERFORM apply_goal_progress(NEW.related_goal_id, NEW.created_at, NEW.value, 1);
+    END IF;
+    RETURN NULL;
+END
+$fn$ LANGUAGE plpgsql
+"""
+
+CREATE_PROGRESS_LOGS_TRIGGER = (
+    "CREATE TRIGGER progress_logs_goal_rollup "
+    "AFTER INSERT OR DELETE OR UPDATE OF related_goal_id, value, created_at ON progress_logs "
+    "FOR EACH ROW EXECUTE FUNCTION progress_logs_goal_rollup()"
+)
+
+
+def _quoted(statement: str) -> str:
+    return "$ddl$" + statement + "$ddl$"
+
+
+# Databases built by create_all rather than migrations get the trigger here.
+# Listening on the metadata runs it after progress_logs exists, on every boot,
+# so it is a no-op once the trigger is there. The advisory lock keeps workers
+# starting together from installing it twice.
+event.listen(Base.metadata, "after_create", DDL(f"""
+DO $install$
+BEGIN
+    PERFORM pg_advisory_xact_lock({INSTALL_LOCK_KEY});
+    IF EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'progress_logs_goal_rollup') THEN
+        RETURN;
+    END IF;
+    EXECUTE {_quoted(APPLY_GOAL_PROGRESS_FUNCTION)};
+    EXECUTE {_quoted(PROGRESS_LOGS_TRIGGER_FUNCTION)};
+    -- Log writes wait while backfilling so no insert is counted twice or missed
+    LOCK TABLE progress_logs IN SHARE MODE;
+    EXECUTE {_quoted(CREATE_PROGRESS_LOGS_TRIGGER)};
+    DELETE FROM goal_progress_rollups;
+    EXECUTE {_quoted(REBUILD_GOAL_ROLLUPS)};
+    EXECUTE {_quoted(SYNC_GOAL_CURRENT_VALUES)};
+END $install$
+"""))
@@ -1,5 +1,5 @@
-from sqlalchemy import (CheckConstraint, Column, DateTime, ForeignKey, Integer,
-                        Numeric, String, Text, text)
+from sqlalchemy import (CheckConstraint, Column, DateTime, ForeignKey, Index,
+                        Integer, Numeric, String, Text, text)
 
 from app.db.database import Base
 
@@ -23,4 +23,8 @@ class ProgressLog(Base):
     __table_args__ = (
         CheckConstraint("log_type IN ('task_update', 'goal_progress', 'media_upload', 'activity', 'focus_session')"),
         CheckConstraint("energy_level BETWEEN 1 AND 5"),
+        Index('ix_progress_logs_created_at', 'created_at'),
+        Index('ix_progress_logs_related_task_id', 'related_task_id'),
+        Index('ix_progress_logs_related_goal_id', 'related_goal_id'),
+        Index('ix_progress_logs_related_project_id', 'related_project_id'),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint, text
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -25,4 +25,7 @@ class Task(Base):
         CheckConstraint("status IN ('todo', 'in_progress', 'blocked', 'completed')"),
         CheckConstraint("priority IN ('high', 'medium', 'low')"),
         CheckConstraint("parent_task_id != task_id"),
+        Index('ix_tasks_status', 'status'),
+        Index('ix_tasks_project_id', 'project_id'),
+        Index('ix_tasks_parent_task_id', 'parent_task_id'),
     )
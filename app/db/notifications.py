@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in notification payloads so a worker can skip
+# the invalidations it caused itself.
+WORKER_ID = uuid.uuid4().hex[:12]
+
+NotificationCallback = Callable[[str, str], None]
+ResetCallback = Callable[[], None]
+
+
+class PgNotificationHub:
+    """
+    Single LISTEN connection per process that fans Postgres notifications out
+    to in-process subscribers.
+
+    Subscribers also register a reset callback, called whenever the listener
+    (re)connects, because notifications sent while it was down are lost and
+    anything cached in the meantime can no longer be trusted.
+
+    LISTEN needs a session-level connection, so this does not work through
+    pgbouncer in transaction pooling mode; ``listening`` then stays False and
+    callers fall back to uncached behaviour.
+    """
+
+    def __init__(self, reconnect_delay: float = 5.0):
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: Dict[str, List[NotificationCallback]] = {}
+        self._reset_callbacks: List[ResetCallback] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lost: Optional[asyncio.Event] = None
+
+    @property
+    def listening(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(self, channel: str, callback: NotificationCallback, on_reset: Optional[ResetCallback] = None) -> None:
+        is_new_channel = channel not in self._subscribers
+        self._subscribers.setdefault(channel, []).append(callback)
+        if on_reset is not None:
+            self._reset_callbacks.append(on_reset)
+        if is_new_channel and self._lost is not None:
+            # Reconnect so the new channel is LISTENed to and every cache resets
+            self._lost.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._connect()
+                await self._lost.wait()
+                logger.warning("Notification listener connection reset, reconnecting")
+                await self._close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener failed: {str(e)}")
+                await self._close()
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _connect(self) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._lost = asyncio.Event()
+        connection = await asyncpg.connect(dsn)
+        connection.add_termination_listener(lambda _: self._lost.set())
+        try:
+            for channel in self._subscribers:
+                await connection.add_listener(channel, self._dispatch)
+        except Exception:
+            connection.terminate()
+            raise
+        # Only report as listening once every channel is subscribed and the
+        # caches have been reset
+        for reset in self._reset_callbacks:
+            reset()
+        self._connection = connection
+        logger.info(f"Listening for notifications on {', '.join(self._subscribers) or 'no channels'}")
+
+    async def _close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close()
+            except Exception:
+                connection.terminate()
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        origin, _, body = payload.partition(":")
+        if origin == WORKER_ID:
+            return
+        for callback in self._subscribers.get(channel, []):
+            try:
+                callback(channel, body)
+            except Exception as e:
+                logger.error(f"Notification callback for {channel} failed: {str(e)}")
+
+
+async def notify(db: AsyncSession, channel: str, payload: str) -> None:
+    """
+    Queue a notification inside the session's transaction.
+
+    Postgres delivers it only when the transaction commits and drops it on
+    rollback, so listeners never react to writes that did not happen.
+    """
+    await db.execute(select(func.pg_notify(channel, f"{WORKER_ID}:{payload}")))
+
+
+notification_hub = PgNotificationHub()
@@ -0,0 +1,184 @@
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import SQL_QUERY_CACHE_INVALIDATIONS, SQL_QUERY_CACHE_LOOKUPS
+from app.db.database import Base
+from app.db.notifications import notification_hub, notify
+from app.db.unit_of_work import commit_or_flush, current_unit_of_work
+
+SQL_TABLES_CHANNEL = "sql_tables_changed"
+
+SQL_QUERY_CACHE_SIZE = int(os.getenv("SQL_QUERY_CACHE_SIZE", "256"))
+# Bounds staleness from writes that do not go through the SQL tool
+SQL_QUERY_CACHE_TTL = float(os.getenv("SQL_QUERY_CACHE_TTL", "300"))
+# auto: trust the cache only while the cross-worker invalidation listener is up
+# process: always trust it (single worker deployments)
+# off: always run the query
+SQL_QUERY_CACHE = os.getenv("SQL_QUERY_CACHE", "auto").lower()
+
+# Tables that database triggers update whenever the key table is written
+DERIVED_TABLES: Dict[str, Tuple[str, ...]] = {
+    "progress_logs": ("goals", "goal_progress_rollups"),
+}
+# Append-only logs written in the background by BufferedInsertWriter, which
+# announces nothing, so queries reading them are never cached
+UNCACHED_TABLES = frozenset({"chat_history", "ai_interactions"})
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_IDENTIFIER = re.compile(r'"?([a-z_][a-z0-9_]*)"?')
+# Results of these change without any write, so they are never cached
+_VOLATILE = re.compile(
+    r"\b(now|random|clock_timestamp|statement_timestamp|timeofday|nextval|currval"
+    r"|current_date|current_time|current_timestamp|localtime|localtimestamp)\b"
+    # age(x) measures from the current date; only age(x, y) is stable
+    r"|\bage\s*\("
+)
+# Date and time input strings that Postgres resolves against the clock, e.g. 'today'::date
+_VOLATILE_LITERAL = re.compile(r"'\s*(now|today|tomorrow|yesterday)\s*'", re.IGNORECASE)
+
+
+class CacheEntry(NamedTuple):
+    result: Any
+    tables: FrozenSet[str]
+    generations: Tuple[int, ...]
+    stored_at: float
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and case outside string literals and drop the trailing semicolon."""
+    parts = _STRING_LITERAL.split(sql.strip().rstrip(";"))
+    return "".join(
+        part if index % 2 else " ".join(part.split()).lower()
+        for index, part in enumerate(parts)
+    ).strip()
+
+
+def referenced_tables(normalized_sql: str) -> Optional[FrozenSet[str]]:
+    """
+    Tables a normalized query may read, or None when it must not be cached.
+
+    Every identifier naming a mapped table counts, which can over-invalidate
+    but never misses a dependency on a mapped table.
+    """
+    if _VOLATILE_LITERAL.search(normalized_sql):
+        return None
+    code = _STRING_LITERAL.sub("''", normalized_sql)
+    if _VOLATILE.search(code):
+        return None
+    tables = frozenset(
+        name for name in _IDENTIFIER.findall(code) if name in Base.metadata.tables
+    )
+    if not tables or tables & UNCACHED_TABLES:
+        return None
+    return tables
+
+
+class QueryResultCache:
+    """
+    Formatted results of read-only SQL tool queries, keyed by normalized SQL and params.
+
+    Each table carries a generation number that writes bump, and an entry is
+    only served while the generations of every table it read are unchanged.
+    A reader snapshots the generations before running its query, so a result
+    that raced with a write is never stored as fresh.
+    """
+
+    def __init__(self, max_entries: int = SQL_QUERY_CACHE_SIZE, ttl: float = SQL_QUERY_CACHE_TTL,
+                 mode: str = SQL_QUERY_CACHE):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.mode = mode
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        # Bumped by clear() so reads in flight during a reset are not stored
+        self._epoch = 0
+
+    @property
+    def usable(self) -> bool:
+        if self.mode == "off" or self.max_entries <= 0:
+            return False
+        if self.mode == "process":
+            return True
+        return notification_hub.listening
+
+    @staticmethod
+    def key(normalized_sql: str, params: Optional[dict] = None) -> str:
+        if not params:
+            return normalized_sql
+        return f"{normalized_sql}\n{json.dumps(params, sort_keys=True, default=str)}"
+
+    def generations(self, tables: FrozenSet[str]) -> Tuple[int, ...]:
+        return (self._epoch, *(self._generations.get(table, 0) for table in sorted(tables)))
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            SQL_QUERY_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+        if (time.monotonic() - entry.stored_at > self.ttl
+                or entry.generations != self.generations(entry.tables)):
+            del self._entries[key]
+            SQL_QUERY_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        SQL_QUERY_CACHE_LOOKUPS.labels(result="hit").inc()
+        return entry.result
+
+    def put(self, key: str, result: Any, tables: FrozenSet[str], generations: Tuple[int, ...]) -> None:
+        """Store a result unless one of its tables was written while it was computed."""
+        if generations != self.generations(tables):
+            return
+        self._entries[key] = CacheEntry(result, tables, generations, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, table: str, origin: str = "local") -> None:
+        for name in (table, *DERIVED_TABLES.get(table, ())):
+            self._generations[name] = self._generations.get(name, 0) + 1
+        SQL_QUERY_CACHE_INVALIDATIONS.labels(origin=origin).inc()
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+
+
+query_cache = QueryResultCache()
+
+
+async def commit_writes(db: AsyncSession, table_names: Iterable[str]) -> None:
+    """
+    Commit writes to table_names, or defer to the turn, and drop cached results that read them.
+
+    Other workers are told through SQL_TABLES_CHANNEL, which Postgres only
+    delivers if the transaction commits.
+    """
+    tables = {table for table in table_names if table not in UNCACHED_TABLES}
+    for table in sorted(tables):
+        await notify(db, SQL_TABLES_CHANNEL, table)
+
+    def invalidate_tables() -> None:
+        for table in tables:
+            query_cache.invalidate(table)
+
+    uow = current_unit_of_work()
+    if uow is not None and uow.session is db:
+        # Other turns could cache the old rows until this turn commits
+        invalidate_tables()
+        uow.on_commit(invalidate_tables)
+        await commit_or_flush(db)
+    else:
+        await commit_or_flush(db)
+        invalidate_tables()
+
+notification_hub.subscribe(
+    SQL_TABLES_CHANNEL,
+    lambda _channel, table: query_cache.invalidate(table, origin="remote"),
+    on_reset=query_cache.clear,
+)
@@ -1,3 +1,6 @@
+from .ai_interaction_repository import AIInteractionRepository
+from .dashboard_repository import DashboardRepository
+from .goal_progress_repository import GoalProgressRepository
 from .goal_repository import GoalRepository
 from .progress_log_repository import ProgressLogRepository
 from .project_repository import ProjectRepository
@@ -7,5 +10,8 @@ __all__ = [
     "ProjectRepository",
     "TaskRepository",
     "GoalRepository",
-    "ProgressLogRepository"
+    "GoalProgressRepository",
+    "ProgressLogRepository",
+    "AIInteractionRepository",
+    "DashboardRepository"
 ]
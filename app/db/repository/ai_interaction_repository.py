@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.ai_interaction import AIInteraction
+
+from .base_repository import BaseRepository
+
+
+class AIInteractionRepository(BaseRepository[AIInteraction]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(AIInteraction, db)
+
+    async def cost_by_session(self, since: Optional[datetime] = None):
+        query = text("""
+            SELECT session_id,
+                   count(DISTINCT turn_id) AS turns,
+                   count(*) AS calls,
+                   sum(prompt_tokens) AS prompt_tokens,
+                   sum(cached_tokens) AS cached_tokens,
+                   sum(completion_tokens) AS completion_tokens,
+                   sum(reasoning_tokens) AS reasoning_tokens,
+                   sum(cost_usd) AS cost_usd
+            FROM ai_interactions
+            WHERE model IS NOT NULL AND (CAST(:since AS timestamptz) IS NULL OR created_at >= :since)
+            GROUP BY session_id
+            ORDER BY cost_usd DESC NULLS LAST
+        """)
+        result = await self.db.execute(query, {"since": since})
+        return result.mappings().all()
+
+    async def cost_by_tool(self, since: Optional[datetime] = None):
+        # A call that requested several tools splits its cost evenly between them;
+        # calls without tool requests are the final answers.
+        query = text("""
+            SELECT tool,
+                   count(*) AS calls,
+                   sum(prompt_tokens::numeric / tool_count) AS prompt_tokens,
+                   sum(completion_tokens::numeric / tool_count) AS completion_tokens,
+                   sum(cost_usd / tool_count) AS cost_usd
+            FROM (
+                SELECT i.prompt_tokens, i.completion_tokens, i.cost_usd,
+                       coalesce(t.tool, 'final_answer') AS tool,
+                       greatest(coalesce(json_array_length(i.tool_names), 0), 1) AS tool_count
+                FROM ai_interactions i
+                LEFT JOIN LATERAL json_array_elements_text(i.tool_names) AS t(tool) ON true
+                WHERE i.kind = 'chat' AND (CAST(:since AS timestamptz) IS NULL OR i.created_at >= :since)
+            ) per_tool
+            GROUP BY tool
+            ORDER BY cost_usd DESC NULLS LAST
+        """)
+        result = await self.db.execute(query, {"since": since})
+        return result.mappings().all()
+
+    async def get_prompt_section_usage(self, since: Optional[datetime] = None) -> AsyncIterator[Any]:
+        """Yield (model, prompt_tokens, cached_tokens, prompt_sections) rows a keyset page at a time."""
+        where = [self.model.kind == 'chat', self.model.prompt_sections.is_not(None)]
+        if since is not None:
+            where.append(self.model.created_at >= since)
+        columns = [self.model.model, self.model.prompt_tokens, self.model.cached_tokens, self.model.prompt_sections]
+        async for row in self.iter_pages(where=where, columns=columns, page_size=1000):
+            yield row[:4]
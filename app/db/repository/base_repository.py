@@ -1,26 +1,69 @@
-from typing import Any, Generic, List, Optional, Type, TypeVar
+from typing import (Any, AsyncIterator, Dict, Generic, List, NamedTuple,
+                    Optional, Sequence, Tuple, Type, TypeVar)
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import (delete, func, insert, inspect, literal, select, tuple_,
+                        update)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.base import BaseModel
+from ..database import Base
+from ..query_cache import commit_writes
+
+ModelType = TypeVar("ModelType", bound=Base)
+
+
+def _same_column(a: Any, b: Any) -> bool:
+    """Compare mapped attributes and table columns by the column they refer to."""
+    a = a.__clause_element__() if hasattr(a, "__clause_element__") else a
+    b = b.__clause_element__() if hasattr(b, "__clause_element__") else b
+    return a.compare(b)
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    # Pass back as ``after`` for the next page; None once the last page is reached
+    next_cursor: Optional[Tuple[Any, ...]]
 
-ModelType = TypeVar("ModelType", bound=BaseModel)
 
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
+        # Models name their keys task_id, goal_id, ... so never assume "id"
+        self.pk = inspect(model).primary_key[0]
+
+    async def _commit(self) -> None:
+        """Commit, or defer to the turn, and invalidate cached SQL tool results that read this table."""
+        await commit_writes(self.db, {self.model.__tablename__})
 
     async def create(self, obj_in: dict) -> ModelType:
-        db_obj = self.model(**obj_in)
-        self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
+        query = insert(self.model).values(**obj_in).returning(self.model)
+        db_obj = (await self.db.scalars(query)).one()
+        await self._commit()
         return db_obj
 
+    async def create_many(self, rows: List[Dict[str, Any]], returning: Optional[Sequence[Any]] = None) -> List[Any]:
+        """
+        Insert several rows with one INSERT ... RETURNING.
+
+        Args:
+            rows: Column values for each new row
+            returning: Columns to return instead of full entities, e.g. [self.pk]
+
+        Returns:
+            List[Any]: The created entities, or Row tuples of the returning columns
+        """
+        if not rows:
+            return []
+        if returning is None:
+            created = list((await self.db.scalars(insert(self.model).returning(self.model), rows)).all())
+        else:
+            created = list((await self.db.execute(insert(self.model).returning(*returning), rows)).all())
+        await self._commit()
+        return created
+
     async def get(self, id: Any) -> Optional[ModelType]:
-        query = select(self.model).where(self.model.id == id)
+        query = select(self.model).where(self.pk == id)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
@@ -35,16 +78,173 @@ class BaseRepository(Generic[ModelType]):
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_columns(self, columns: Sequence[Any], where=None, limit=None, order_by=None) -> List[Any]:
+        """Like get_all, but select only the given columns and return lightweight Rows."""
+        query = select(*columns)
+        if where:
+            query = query.where(*where)
+        if order_by:
+            query = query.order_by(*order_by)
+        if limit:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
+        return list(result.all())
+
+    async def find_similar(
+        self, column: Any, text_query: str, limit: int = 5, columns: Optional[Sequence[Any]] = None
+    ) -> List[Any]:
+        """
+        Rank rows whose column fuzzily contains text_query, using pg_trgm.
+
+        Rows are filtered with the <% operator so a trigram GIN index on the
+        column can serve the query; pg_trgm.word_similarity_threshold sets the cut-off.
+
+        Args:
+            column: Text column to match against
+            text_query: Words to look for
+            limit: Maximum number of rows
+            columns: Columns to select, defaults to the primary key and column
+
+        Returns:
+            List[Any]: Rows of columns plus a score between 0 and 1, best first
+        """
+        score = func.word_similarity(text_query, column).label("score")
+        query = (
+            select(*(columns or (self.pk, column)), score)
+            .where(literal(text_query).op("<%")(column))
+            .order_by(score.desc())
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return list(result.all())
+
+    async def get_page(
+        self,
+        where=None,
+        columns: Optional[Sequence[Any]] = None,
+        key: Optional[Any] = None,
+        after: Optional[Tuple[Any, ...]] = None,
+        limit: int = 100,
+        descending: bool = False,
+    ) -> Page:
+        """
+        Fetch one page with keyset (seek) pagination.
+
+        Pages are ordered by key, a timestamp or other column, with the primary
+        key as tie-breaker, and each page seeks past the previous page's last
+        row instead of using OFFSET, so every page costs the same however deep.
+
+        Args:
+            where: Optional filter criteria
+            columns: Columns to project into Rows instead of loading entities;
+                the ordering columns are appended when not already included
+            key: Non-null column to order by; the primary key when omitted
+            after: next_cursor of the previous page, None for the first page
+            limit: Page size
+            descending: Walk from the newest/highest key down
+
+        Returns:
+            Page: The rows and the cursor for the next page
+        """
+        order_columns = [self.pk] if key is None or _same_column(key, self.pk) else [key, self.pk]
+        if columns is None:
+            query = select(self.model, *order_columns)
+        else:
+            extra = [column for column in order_columns if not any(_same_column(column, c) for c in columns)]
+            query = select(*columns, *extra)
+        if where:
+            query = query.where(*where)
+        if after is not None:
+            position = tuple_(*order_columns)
+            query = query.where(position < tuple_(*after) if descending else position > tuple_(*after))
+        query = query.order_by(*(column.desc() if descending else column.asc() for column in order_columns))
+        rows = (await self.db.execute(query.limit(limit))).all()
+
+        items = [row[0] for row in rows] if columns is None else list(rows)
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = tuple(rows[-1]._mapping[column] for column in order_columns)
+        return Page(items, next_cursor)
+
+    async def iter_pages(self, page_size: int = 500, **kwargs) -> AsyncIterator[Any]:
+        """Iterate over every matching row a keyset page at a time; accepts get_page's arguments."""
+        after = kwargs.pop("after", None)
+        while True:
+            page = await self.get_page(after=after, limit=page_size, **kwargs)
+            for item in page.items:
+                yield item
+            if page.next_cursor is None:
+                return
+            after = page.next_cursor
+
+    async def stream_all(self, where=None, order_by=None, batch_size: int = 500) -> AsyncIterator[ModelType]:
+        """Iterate over matching entities through a server-side cursor, batch_size rows at a time."""
+        query = select(self.model).execution_options(yield_per=batch_size)
+        if where:
+            query = query.where(*where)
+        if order_by:
+            query = query.order_by(*order_by)
+        result = await self.db.stream_scalars(query)
+        async for db_obj in result:
+            yield db_obj
+
     async def update(self, id: Any, obj_in: dict) -> Optional[ModelType]:
-        query = update(self.model).where(self.model.id == id).values(**obj_in)
-        await self.db.execute(query)
-        await self.db.commit()
-        return await self.get(id)
+        query = update(self.model).where(self.pk == id).values(**obj_in).returning(self.model)
+        db_obj = (await self.db.scalars(query)).one_or_none()
+        await self._commit()
+        return db_obj
+
+    async def update_many(self, where: Sequence[Any], values: Dict[str, Any]) -> List[ModelType]:
+        """Apply the same values to every matching row with one UPDATE ... RETURNING."""
+        query = update(self.model).where(*where).values(**values).returning(self.model)
+        updated = list((await self.db.scalars(query)).all())
+        await self._commit()
+        return updated
+
+    async def upsert(
+        self,
+        rows: List[Dict[str, Any]],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> List[ModelType]:
+        """
+        Insert rows, updating those that collide on conflict_columns, in one statement.
+
+        Args:
+            rows: Column values for each row
+            conflict_columns: Columns of the unique index or constraint to arbitrate on
+            update_columns: Columns overwritten on conflict; every other supplied
+                column when omitted, and nothing (DO NOTHING) when empty
+
+        Returns:
+            List[ModelType]: Inserted and updated entities; rows skipped by DO NOTHING are not returned
+        """
+        if not rows:
+            return []
+        query = pg_insert(self.model).values(rows)
+        if update_columns is None:
+            update_columns = [column for column in rows[0] if column not in conflict_columns]
+        if update_columns:
+            query = query.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={column: query.excluded[column] for column in update_columns},
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        query = query.returning(self.model).execution_options(populate_existing=True)
+        upserted = list((await self.db.scalars(query)).all())
+        await self._commit()
+        return upserted
 
     async def delete(self, id: Any) -> bool:
-        query = delete(self.model).where(self.model.id == id)
+        query = delete(self.model).where(self.pk == id)
         result = await self.db.execute(query)
-        await self.db.commit()
-        return result.rowcount > 0
-        await self.db.commit()
+        await self._commit()
         return result.rowcount > 0
+
+    async def delete_where(self, where: Sequence[Any]) -> List[Any]:
+        """Delete every matching row with one DELETE ... RETURNING and return their primary keys."""
+        query = delete(self.model).where(*where).returning(self.pk)
+        deleted = list((await self.db.scalars(query)).all())
+        await self._commit()
+        return deleted
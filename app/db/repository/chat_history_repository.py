@@ -1,11 +1,43 @@
+from typing import Any, AsyncIterator, Dict, List, Sequence
 
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.chat_history import ChatHistory
 
+from ..unit_of_work import commit_or_flush
 from .base_repository import BaseRepository
 
 
 class ChatHistoryRepository(BaseRepository[ChatHistory]):
     def __init__(self, db: AsyncSession):
-        super().__init__(ChatHistory, db)
\ No newline at end of file
+        super().__init__(ChatHistory, db)
+
+    async def add_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> List[int]:
+        """Insert all messages of a turn with one multi-row INSERT and one commit."""
+        rows = await self.create_many(
+            [{"session_id": session_id, "message": message} for message in messages],
+            returning=[self.pk],
+        )
+        return [row[0] for row in rows]
+
+    async def stream_messages_after(
+        self, session_id: str, after_id: int, roles: Sequence[str]
+    ) -> AsyncIterator[Any]:
+        """Yield (id, message, created_at) rows newer than after_id in id order, a keyset page at a time."""
+        async for row in self.iter_pages(
+            where=[
+                self.model.session_id == session_id,
+                self.model.message["role"].as_string().in_(roles),
+            ],
+            columns=[self.model.id, self.model.message, self.model.created_at],
+            after=(after_id,),
+            page_size=1000,
+        ):
+            yield row
+
+    async def delete_session(self, session_id: str) -> int:
+        query = delete(self.model).where(self.model.session_id == session_id)
+        result = await self.db.execute(query)
+        await commit_or_flush(self.db)
+        return result.rowcount
@@ -0,0 +1,102 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Defining queries of the dashboard materialized views. They are also run
+# directly while the views do not exist. Migration a93e7c2f5d14 created the
+# views from a frozen copy, so changing a query here needs a new migration
+# that recreates its view.
+DASHBOARD_VIEWS: Dict[str, str] = {
+    "dashboard_projects": """
+        SELECT p.project_id, p.name, p.status, p.priority, p.deadline,
+               count(t.task_id) FILTER (WHERE t.status = 'todo') AS todo,
+               count(t.task_id) FILTER (WHERE t.status = 'in_progress') AS in_progress,
+               count(t.task_id) FILTER (WHERE t.status = 'blocked') AS blocked,
+               count(t.task_id) FILTER (WHERE t.status = 'completed') AS completed,
+               count(t.task_id) AS total,
+               now() AS refreshed_at
+        FROM projects p
+        LEFT JOIN tasks t ON t.project_id = p.project_id
+        WHERE p.status IN ('planning', 'active', 'paused')
+        GROUP BY p.project_id
+    """,
+    "dashboard_in_progress_tasks": """
+        SELECT t.task_id, t.title, t.project_id, t.priority, t.due_date, t.created_at,
+               max(l.created_at) AS last_progress_at,
+               now() AS refreshed_at
+        FROM tasks t
+        LEFT JOIN progress_logs l ON l.related_task_id = t.task_id
+        WHERE t.status = 'in_progress'
+        GROUP BY t.task_id
+    """,
+    "dashboard_goals": """
+        SELECT g.goal_id, g.title, g.goal_type, g.current_value, g.target_value, g.unit, g.deadline,
+               CASE WHEN g.target_value > 0
+                    THEN round(coalesce(g.current_value, 0) / g.target_value, 2)
+               END AS completion_ratio,
+               max(l.created_at) AS last_progress_at,
+               now() AS refreshed_at
+        FROM goals g
+        LEFT JOIN progress_logs l ON l.related_goal_id = g.goal_id
+        WHERE g.status = 'active'
+        GROUP BY g.goal_id
+    """,
+}
+
+# Arbitrary key for the advisory lock that lets one worker refresh at a time
+REFRESH_LOCK_KEY = 7_349_012_118
+
+
+class DashboardRepository:
+    """Reads the dashboard materialized views, or their defining queries when live=True."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _source(view: str, live: bool) -> str:
+        return f"({DASHBOARD_VIEWS[view]}) AS {view}" if live else view
+
+    async def views_exist(self) -> bool:
+        query = text("SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(CAST(:names AS text[])) AS name")
+        return bool((await self.db.execute(query, {"names": list(DASHBOARD_VIEWS)})).scalar())
+
+    async def get_projects(self, live: bool = False) -> List[Any]:
+        query = text(
+            f"SELECT * FROM {self._source('dashboard_projects', live)} "
+            "ORDER BY in_progress DESC, deadline NULLS LAST, project_id"
+        )
+        return list((await self.db.execute(query)).mappings().all())
+
+    async def get_stale_tasks(self, stale_days: int, limit: int = 20, live: bool = False) -> List[Any]:
+        """In-progress tasks whose latest progress log, or creation if they have none, is older than stale_days."""
+        query = text(
+            f"SELECT * FROM {self._source('dashboard_in_progress_tasks', live)} "
+            "WHERE coalesce(last_progress_at, created_at) < now() - make_interval(days => :days) "
+            "ORDER BY coalesce(last_progress_at, created_at) LIMIT :limit"
+        )
+        return list((await self.db.execute(query, {"days": stale_days, "limit": limit})).mappings().all())
+
+    async def get_goals(self, live: bool = False) -> List[Any]:
+        query = text(
+            f"SELECT * FROM {self._source('dashboard_goals', live)} "
+            "ORDER BY deadline NULLS LAST, completion_ratio NULLS LAST, goal_id"
+        )
+        return list((await self.db.execute(query)).mappings().all())
+
+    async def refresh(self) -> bool:
+        """
+        Refresh every view without blocking readers, unless another worker already is.
+
+        Returns:
+            bool: False when the refresh was skipped because the lock was taken
+        """
+        locked = (await self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        )).scalar()
+        if not locked:
+            return False
+        for view in DASHBOARD_VIEWS:
+            await self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+        return True
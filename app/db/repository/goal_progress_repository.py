@@ -0,0 +1,65 @@
+from datetime import date
+from typing import Any, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.goal_progress_rollup import (GOAL_ROLLUP_TIMEZONE,
+                                                REBUILD_GOAL_ROLLUPS,
+                                                SYNC_GOAL_CURRENT_VALUES,
+                                                GoalProgressRollup)
+
+from ..unit_of_work import commit_or_flush
+from .base_repository import BaseRepository
+
+# Arbitrary key for the advisory lock that lets one worker reconcile at a time
+RECONCILE_LOCK_KEY = 7_349_012_119
+
+_REBUILD_ROLLUPS = text(REBUILD_GOAL_ROLLUPS)
+_SYNC_CURRENT_VALUES = text(SYNC_GOAL_CURRENT_VALUES)
+
+
+class GoalProgressRepository(BaseRepository[GoalProgressRollup]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(GoalProgressRollup, db)
+
+    async def get_rollups(self, goal_id: int, period: str, limit: int = 4) -> List[Any]:
+        """Latest rollup rows of a goal, newest period first; periods without logs have no row."""
+        return await self.get_columns(
+            [self.model.period_start, self.model.total, self.model.entries, self.model.last_logged_at],
+            where=[self.model.goal_id == goal_id, self.model.period == period],
+            order_by=[self.model.period_start.desc()],
+            limit=limit,
+        )
+
+    async def get_period(self, goal_id: int, period: str, period_start: date) -> Optional[GoalProgressRollup]:
+        return await self.db.get(self.model, (goal_id, period, period_start))
+
+    async def current_period_starts(self) -> Any:
+        """Start of today and of this ISO week in the rollup timezone."""
+        query = text(
+            "SELECT (now() AT TIME ZONE :tz)::date AS day, "
+            "date_trunc('week', now() AT TIME ZONE :tz)::date AS week"
+        )
+        return (await self.db.execute(query, {"tz": GOAL_ROLLUP_TIMEZONE})).one()
+
+    async def reconcile(self) -> bool:
+        """
+        Rebuild every rollup row and logged goal's current_value from progress_logs.
+
+        Log writes wait on a SHARE lock meanwhile, so none is lost or counted twice.
+
+        Returns:
+            bool: False when skipped because another worker is reconciling
+        """
+        locked = (await self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RECONCILE_LOCK_KEY}
+        )).scalar()
+        if not locked:
+            return False
+        await self.db.execute(text("LOCK TABLE progress_logs IN SHARE MODE"))
+        await self.db.execute(text("DELETE FROM goal_progress_rollups"))
+        await self.db.execute(_REBUILD_ROLLUPS)
+        await self.db.execute(_SYNC_CURRENT_VALUES)
+        await commit_or_flush(self.db)
+        return True
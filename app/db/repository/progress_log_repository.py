@@ -19,5 +19,3 @@ class ProgressLogRepository(BaseRepository[ProgressLog]):
         query = select(self.model).where(self.model.related_goal_id == goal_id)
         result = await self.db.execute(query)
         return result.scalars().all()
-        result = await self.db.execute(query)
-        return result.scalars().all()
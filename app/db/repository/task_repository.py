@@ -1,15 +1,21 @@
-from sqlalchemy import select
+from typing import Any, List
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.db.models.task import Task
 
 from .base_repository import BaseRepository
 
+TREE_COLUMNS = ("task_id", "parent_task_id", "project_id", "title", "status", "priority", "due_date")
+
 
 class TaskRepository(BaseRepository[Task]):
     def __init__(self, db: AsyncSession):
         super().__init__(Task, db)
-    
+
     async def get_by_project(self, project_id: int):
         query = select(self.model).where(self.model.project_id == project_id)
         result = await self.db.execute(query)
@@ -19,6 +25,53 @@ class TaskRepository(BaseRepository[Task]):
         query = select(self.model).where(self.model.parent_task_id == parent_task_id)
         result = await self.db.execute(query)
         return result.scalars().all()
-        query = select(self.model).where(self.model.parent_task_id == parent_task_id)
+
+    async def get_task_tree(self, task_id: int) -> List[Any]:
+        """
+        Fetch a task and all of its descendants in one recursive query.
+
+        Args:
+            task_id: Root of the tree
+
+        Returns:
+            List[Any]: Rows of TREE_COLUMNS plus depth (0 for the root), in depth-first order
+        """
+        return await self._fetch_tree(self.model.task_id == task_id)
+
+    async def get_project_tree(self, project_id: int) -> List[Any]:
+        """
+        Fetch every task of a project as a hierarchy in one recursive query.
+
+        Args:
+            project_id: Project whose top-level tasks are the roots
+
+        Returns:
+            List[Any]: Rows of TREE_COLUMNS plus depth (0 for top-level tasks), in depth-first order
+        """
+        return await self._fetch_tree(
+            self.model.project_id == project_id, self.model.parent_task_id.is_(None)
+        )
+
+    async def _fetch_tree(self, *root_criteria) -> List[Any]:
+        columns = [getattr(self.model, name) for name in TREE_COLUMNS]
+        tree = select(
+            *columns,
+            literal(0).label("depth"),
+            array([self.model.task_id]).label("path"),
+        ).where(*root_criteria).cte("task_tree", recursive=True)
+
+        child = aliased(self.model)
+        tree = tree.union_all(
+            select(
+                *(getattr(child, name) for name in TREE_COLUMNS),
+                (tree.c.depth + 1).label("depth"),
+                func.array_append(tree.c.path, child.task_id).label("path"),
+            )
+            .join(tree, child.parent_task_id == tree.c.task_id)
+            # Guards against cycles longer than the self-reference the check constraint forbids
+            .where(child.task_id != tree.c.path.all_())
+        )
+
+        query = select(*(tree.c[name] for name in TREE_COLUMNS), tree.c.depth).order_by(tree.c.path)
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return list(result.all())
@@ -0,0 +1,160 @@
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db, get_read_db, replica_router
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """
+    One session and one transaction shared by everything a turn does.
+
+    Repositories and SQL tools write through it without committing, and the
+    turn commits once when it has produced its reply or rolls everything
+    back if it fails. A turn therefore holds a single pooled connection and
+    pays for a single commit however many statements it runs.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.pending_writes = False
+        # Stays set after the commit so later reads in the turn see its own writes
+        self.has_written = False
+        self._rollback_callbacks: List[Callable[[], None]] = []
+        self._commit_callbacks: List[Callable[[], None]] = []
+
+    def mark_write(self) -> None:
+        self.pending_writes = True
+        self.has_written = True
+
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """Undo in-process state that mirrors writes which may still be rolled back."""
+        self._rollback_callbacks.append(callback)
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Update in-process state once the turn's writes are visible to other sessions."""
+        self._commit_callbacks.append(callback)
+
+    async def commit(self) -> None:
+        if self.pending_writes:
+            await self.session.commit()
+            self.pending_writes = False
+            replica_router.note_write()
+        self._rollback_callbacks.clear()
+        callbacks, self._commit_callbacks = self._commit_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
+        self.pending_writes = False
+        self._commit_callbacks.clear()
+        callbacks, self._rollback_callbacks = self._rollback_callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+_current_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar("current_unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_unit_of_work.get()
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """
+    Open the turn's unit of work, or join the one already open.
+
+    Commits pending writes when the block exits normally and rolls them back
+    when it raises.
+    """
+    existing = _current_unit_of_work.get()
+    if existing is not None:
+        yield existing
+        return
+
+    async with get_db() as session:
+        uow = UnitOfWork(session)
+        token = _current_unit_of_work.set(uow)
+        try:
+            yield uow
+            await uow.commit()
+        except BaseException:
+            if uow.pending_writes:
+                logger.warning("Rolling back the turn's uncommitted writes")
+            await uow.rollback()
+            raise
+        finally:
+            _current_unit_of_work.reset(token)
+
+
+@asynccontextmanager
+async def use_session() -> AsyncIterator[AsyncSession]:
+    """Yield the current turn's session, or a short-lived one outside a turn."""
+    uow = _current_unit_of_work.get()
+    if uow is not None:
+        yield uow.session
+        return
+    async with get_db() as session:
+        yield session
+
+
+@asynccontextmanager
+async def use_read_session(default: Optional[AsyncSession] = None) -> AsyncIterator[AsyncSession]:
+    """
+    Yield a session for read-only work, on the replica when that is safe.
+
+    Once the current turn has written, its reads stay on the turn's own
+    session so they see those writes; otherwise the replica is used if one
+    is configured and not lagging, falling back to default or use_session().
+    """
+    uow = _current_unit_of_work.get()
+    if uow is None or not uow.has_written:
+        if await replica_router.use_replica():
+            async with get_read_db() as session:
+                yield session
+            return
+    if default is not None:
+        yield default
+        return
+    async with use_session() as session:
+        yield session
+
+
+@asynccontextmanager
+async def savepoint(session: AsyncSession) -> AsyncIterator[None]:
+    """
+    Isolate one statement of the turn so its failure does not poison the rest.
+
+    A failed statement aborts the whole Postgres transaction; inside a SAVEPOINT
+    only the statement is rolled back and the turn's earlier writes survive.
+    Sessions outside a turn are short-lived and need no savepoint.
+    """
+    uow = _current_unit_of_work.get()
+    if uow is not None and uow.session is session:
+        async with session.begin_nested():
+            yield
+    else:
+        yield
+
+
+async def commit_or_flush(session: AsyncSession) -> None:
+    """
+    Commit the session's writes, deferring to the turn's unit of work.
+
+    Inside a turn the writes are only flushed and the commit is left to the
+    unit of work; any other session commits immediately as before.
+    """
+    uow = _current_unit_of_work.get()
+    if uow is not None and uow.session is session:
+        await session.flush()
+        uow.mark_write()
+    else:
+        await session.commit()
+        replica_router.note_write()
@@ -1,23 +1,23 @@
 import logging
 
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 
+from app.ai.memory.redis_memory import chat_history_archiver, close_redis_client
 from app.api.dependencies import chatbot_controller
 # from app.integrations.evolution_api import get_base64_from_media_message
+from app.core import metrics
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.loop_monitor import LOOP_MONITOR_ENABLED, get_loop_monitor
+from app.core.profiling import PROFILE_HEADER
 from app.core.scheduler import get_scheduler
-from app.db.database import Base, engine, get_db
-
-# Configure root logger
-
-logging.basicConfig(
-    level=logging.INFO,  # Capture all log levels
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(f"./logs/app_{logging.Formatter().formatTime(logging.LogRecord('', 0, '', 0, None, None, None), '%Y-%m-%d')}.log"),  # Daily log file
-        logging.StreamHandler()  # Print logs to console
-    ]
-)
+from app.db.database import Base, engine, replica_engine
+from app.db.notifications import notification_hub
+from app.services.usage_service import usage_recorder
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 @app.on_event("startup")
@@ -33,10 +33,41 @@ async def start_scheduler_event():
     try:
         # Initialize the global scheduler
         get_scheduler()  # This initializes and starts the scheduler if not already running
+        metrics.bind_runtime_gauges()
         print("Scheduler started successfully.")
     except Exception as e:
         print(f"Failed to start scheduler: {str(e)}")
 
+@app.on_event("startup")
+async def start_loop_monitor_event():
+    if LOOP_MONITOR_ENABLED:
+        get_loop_monitor().start()
+
+@app.on_event("startup")
+async def start_notification_hub_event():
+    notification_hub.start()
+
+@app.on_event("shutdown")
+async def stop_notification_hub_event():
+    await notification_hub.stop()
+
+@app.on_event("shutdown")
+async def stop_redis_memory_event():
+    await chat_history_archiver.stop()
+    await close_redis_client()
+
+@app.on_event("startup")
+async def start_usage_recorder_event():
+    usage_recorder.start()
+
+@app.on_event("shutdown")
+async def stop_usage_recorder_event():
+    await usage_recorder.stop()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor_event():
+    await get_loop_monitor().stop()
+
 @app.on_event("shutdown")
 async def shutdown_scheduler_event():
     try:
@@ -46,21 +77,32 @@ async def shutdown_scheduler_event():
         
         # dispose the engine
         await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
         print("Engine disposed successfully.")
     except Exception as e:
         print(f"Error during scheduler shutdown: {str(e)}")
 
+@app.on_event("shutdown")
+async def shutdown_logging_event():
+    shutdown_logging()
+
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the FastAPI application!"}
 
+@app.get("/metrics")
+def read_metrics():
+    payload, content_type = metrics.render_latest()
+    return Response(content=payload, media_type=content_type)
+
 @app.post("/webhook")
 async def webhook(request: Request):
     body = await request.json()
-    logging.info(f'Webhook received: {body}')
-    async with get_db() as db:
-        return await chatbot_controller.handle_webhook_data(body, db)
+    logger.info("Webhook received", extra={"fields": {"body": body}})
+    profile = request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+    return await chatbot_controller.handle_webhook_data(body, profile=profile)
 
 
 def run():
@@ -21,13 +21,18 @@ class AgentService:
             Optional[str]: Agent's response if successful, None otherwise
         """
         logger.info(f'Processing user message: {user_message[:50]}...')
-        await memory_instance.add_message(role="user", content=user_message)
+        message_history = await memory_instance.get_messages(query=user_message)
 
-        response = await agent_response(user_message, message_history=await memory_instance.get_messages())
+        # The whole turn is buffered and persisted in one write, and only once
+        # it produced a reply, so a failed turn never leaves half of itself behind
+        turn = memory_instance.start_turn()
+        turn.add_message(role="user", content=user_message)
+        response = await agent_response(user_message, message_history=message_history, turn=turn)
         if response is None:
             logger.warning("No response generated from agent")
             return None
 
         logger.info(f'Agent response generated: {response[:50]}...')
-        await memory_instance.add_message(role="assistant", content=response)
-        return response 
\ No newline at end of file
+        turn.add_message(role="assistant", content=str(response))
+        await turn.flush()
+        return response
@@ -0,0 +1,62 @@
+import logging
+import os
+from typing import Optional
+
+from app.db.database import get_db
+from app.db.repository import DashboardRepository
+from app.db.unit_of_work import use_read_session
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_REFRESH_MINUTES = int(os.getenv("DASHBOARD_REFRESH_MINUTES", "15"))
+# In-progress tasks without a progress log for this many days count as stale
+DASHBOARD_STALE_DAYS = int(os.getenv("DASHBOARD_STALE_DAYS", "3"))
+DASHBOARD_STALE_TASKS_LIMIT = int(os.getenv("DASHBOARD_STALE_TASKS_LIMIT", "20"))
+
+
+async def refresh_dashboard() -> None:
+    """Scheduler job: refresh the dashboard materialized views."""
+    try:
+        async with get_db() as db:
+            repository = DashboardRepository(db)
+            if not await repository.views_exist():
+                logger.debug("Dashboard views do not exist yet, nothing to refresh")
+                return
+            refreshed = await repository.refresh()
+            await db.commit()
+        if refreshed:
+            logger.info("Dashboard views refreshed")
+        else:
+            logger.debug("Dashboard refresh already running in another worker")
+    except Exception as e:
+        logger.error(f"Failed to refresh dashboard views: {str(e)}")
+
+
+async def get_dashboard_snapshot(stale_days: Optional[int] = None) -> dict:
+    """
+    Read the dashboard in one session.
+
+    Args:
+        stale_days: Days without progress after which an in-progress task is stale
+
+    Returns:
+        dict: projects, stale_tasks and goals rows, whether they came from
+        the views (snapshot) and when those were refreshed
+    """
+    stale_days = DASHBOARD_STALE_DAYS if stale_days is None else stale_days
+    async with use_read_session() as db:
+        repository = DashboardRepository(db)
+        # Computed live until the migration creating the views has run
+        live = not await repository.views_exist()
+        projects = await repository.get_projects(live=live)
+        stale_tasks = await repository.get_stale_tasks(stale_days, DASHBOARD_STALE_TASKS_LIMIT, live=live)
+        goals = await repository.get_goals(live=live)
+    refreshed_at = next((rows[0]["refreshed_at"] for rows in (projects, stale_tasks, goals) if rows), None)
+    return {
+        "projects": projects,
+        "stale_tasks": stale_tasks,
+        "goals": goals,
+        "stale_days": stale_days,
+        "snapshot": not live,
+        "refreshed_at": refreshed_at,
+    }
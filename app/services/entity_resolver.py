@@ -0,0 +1,195 @@
+import heapq
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple, Type
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.db.query_cache import query_cache
+from app.db.repository import GoalRepository, ProjectRepository, TaskRepository
+from app.db.repository.base_repository import BaseRepository
+from app.db.unit_of_work import use_read_session
+
+logger = logging.getLogger(__name__)
+
+ENTITY_MIN_SIMILARITY = float(os.getenv("ENTITY_MIN_SIMILARITY", "0.3"))
+# How long the in-process fallback index trusts its copy of a table's names
+ENTITY_INDEX_TTL = float(os.getenv("ENTITY_INDEX_TTL", "300"))
+# How long to stay on the fallback before checking for pg_trgm again, after
+# finding it missing or after a trigram search failed
+ENTITY_TRGM_RETRY_SECONDS = float(os.getenv("ENTITY_TRGM_RETRY_SECONDS", "300"))
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class EntityType(NamedTuple):
+    repository: Type[BaseRepository]
+    table: str
+    id_column: str
+    name_column: str
+
+
+ENTITY_TYPES: Dict[str, EntityType] = {
+    "task": EntityType(TaskRepository, "tasks", "task_id", "title"),
+    "project": EntityType(ProjectRepository, "projects", "project_id", "name"),
+    "goal": EntityType(GoalRepository, "goals", "goal_id", "title"),
+}
+
+
+class EntityMatch(NamedTuple):
+    entity_type: str
+    id: int
+    name: str
+    status: Optional[str]
+    score: float
+
+
+def trigrams(value: str) -> Set[str]:
+    """Trigrams of each word padded like pg_trgm does: two spaces before, one after."""
+    grams = set()
+    for word in _WORD.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    In-process inverted trigram index over the names of one entity type.
+
+    The score of a name is the share of the query's trigrams it contains,
+    which like pg_trgm's word_similarity rewards a name containing the query
+    words without penalising the rest of a long name.
+    """
+
+    def __init__(self, rows: List[Tuple[int, str, Optional[str]]]):
+        self.rows = {row_id: (name, status) for row_id, name, status in rows}
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for row_id, name, _ in rows:
+            for gram in trigrams(name or ""):
+                self.postings[gram].append(row_id)
+
+    def search(self, query: str, limit: int, min_score: float) -> List[Tuple[int, float]]:
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        # Counter sums the postings in C, far faster than a Python loop per row
+        hits = Counter(chain.from_iterable(self.postings.get(gram, ()) for gram in query_grams))
+        min_hits = max(1, math.ceil(min_score * len(query_grams)))
+        best = heapq.nlargest(limit, (item for item in hits.items() if item[1] >= min_hits), key=itemgetter(1))
+        return [(row_id, count / len(query_grams)) for row_id, count in best]
+
+
+class EntityResolver:
+    """
+    Finds tasks, projects and goals by approximate name.
+
+    Uses the pg_trgm GIN indexes when the extension is installed and falls back
+    to per-type TrigramIndexes otherwise, or for ENTITY_TRGM_RETRY_SECONDS
+    after a trigram search failed. Those are rebuilt when their table is
+    written (tracked through the query cache's table generations) or after
+    ENTITY_INDEX_TTL seconds.
+    """
+
+    def __init__(self, min_similarity: float = ENTITY_MIN_SIMILARITY, index_ttl: float = ENTITY_INDEX_TTL,
+                 trgm_retry: float = ENTITY_TRGM_RETRY_SECONDS):
+        self.min_similarity = min_similarity
+        self.index_ttl = index_ttl
+        self.trgm_retry = trgm_retry
+        self._pg_trgm: Optional[bool] = None
+        self._pg_trgm_checked_at = 0.0
+        self._indexes: Dict[str, Tuple[TrigramIndex, Tuple[int, ...], float]] = {}
+
+    async def resolve(self, name: str, entity_types: List[str], limit: int = 5) -> List[EntityMatch]:
+        """
+        Args:
+            name: Name, or part of one, as the user wrote it
+            entity_types: Keys of ENTITY_TYPES to search
+            limit: Maximum number of matches overall
+
+        Returns:
+            List[EntityMatch]: Best matches first
+        """
+        async with use_read_session() as db:
+            if self._pg_trgm is None or (
+                not self._pg_trgm and time.monotonic() - self._pg_trgm_checked_at > self.trgm_retry
+            ):
+                self._pg_trgm = await self._has_pg_trgm(db)
+                self._pg_trgm_checked_at = time.monotonic()
+            matches: List[EntityMatch] = []
+            if self._pg_trgm:
+                try:
+                    # The savepoint keeps a failure from aborting a turn's transaction
+                    async with db.begin_nested():
+                        # Transaction-local, and only pg_trgm's operators read it
+                        await db.execute(
+                            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+                            {"threshold": str(self.min_similarity)}
+                        )
+                        for entity_type in entity_types:
+                            matches.extend(await self._search_database(db, entity_type, name, limit))
+                except DBAPIError as e:
+                    logger.warning(f"Trigram search failed, using the in-process index for "
+                                   f"{self.trgm_retry:.0f}s: {str(e)}")
+                    self._pg_trgm = False
+                    self._pg_trgm_checked_at = time.monotonic()
+                    matches = []
+            if not self._pg_trgm:
+                for entity_type in entity_types:
+                    matches.extend(await self._search_index(db, entity_type, name, limit))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:limit]
+
+    @staticmethod
+    async def _has_pg_trgm(db) -> bool:
+        installed = (await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))).first()
+        if installed is None:
+            logger.info("pg_trgm is not installed, resolving names with the in-process index")
+        return installed is not None
+
+    async def _search_database(self, db, entity_type: str, name: str, limit: int) -> List[EntityMatch]:
+        spec = ENTITY_TYPES[entity_type]
+        repository = spec.repository(db)
+        model = repository.model
+        rows = await repository.find_similar(
+            getattr(model, spec.name_column),
+            name,
+            limit=limit,
+            columns=[getattr(model, spec.id_column), getattr(model, spec.name_column), model.status],
+        )
+        return [EntityMatch(entity_type, row[0], row[1], row[2], round(row.score, 2)) for row in rows]
+
+    async def _search_index(self, db, entity_type: str, name: str, limit: int) -> List[EntityMatch]:
+        index = await self._index(db, entity_type)
+        return [
+            EntityMatch(entity_type, row_id, *index.rows[row_id], round(score, 2))
+            for row_id, score in index.search(name, limit, self.min_similarity)
+        ]
+
+    async def _index(self, db, entity_type: str) -> TrigramIndex:
+        spec = ENTITY_TYPES[entity_type]
+        tables: FrozenSet[str] = frozenset({spec.table})
+        generations = query_cache.generations(tables)
+        cached = self._indexes.get(entity_type)
+        if (cached is not None and query_cache.usable and cached[1] == generations
+                and time.monotonic() - cached[2] < self.index_ttl):
+            return cached[0]
+
+        repository = spec.repository(db)
+        model = repository.model
+        rows = await repository.get_columns(
+            [getattr(model, spec.id_column), getattr(model, spec.name_column), model.status]
+        )
+        index = TrigramIndex([tuple(row) for row in rows])
+        self._indexes[entity_type] = (index, generations, time.monotonic())
+        return index
+
+
+entity_resolver = EntityResolver()
@@ -0,0 +1,62 @@
+import logging
+import os
+from typing import Optional
+
+from app.db.database import get_db
+from app.db.models.goal import Goal
+from app.db.notifications import notify
+from app.db.query_cache import SQL_TABLES_CHANNEL, query_cache
+from app.db.repository import GoalProgressRepository
+from app.db.unit_of_work import use_read_session
+
+logger = logging.getLogger(__name__)
+
+GOAL_RECONCILE_HOUR = int(os.getenv("GOAL_RECONCILE_HOUR", "3"))
+
+RECONCILED_TABLES = ("goals", "goal_progress_rollups")
+
+
+async def reconcile_goal_progress() -> None:
+    """Scheduler job: rebuild goal rollups and current values from progress_logs."""
+    try:
+        async with get_db() as db:
+            for table in RECONCILED_TABLES:
+                await notify(db, SQL_TABLES_CHANNEL, table)
+            reconciled = await GoalProgressRepository(db).reconcile()
+        if reconciled:
+            for table in RECONCILED_TABLES:
+                query_cache.invalidate(table)
+            logger.info("Goal progress rollups reconciled")
+        else:
+            logger.debug("Goal progress reconciliation already running in another worker")
+    except Exception as e:
+        logger.error(f"Failed to reconcile goal progress: {str(e)}")
+
+
+async def get_goal_progress(goal_id: int, period: str = "week", periods: int = 4) -> Optional[dict]:
+    """
+    Read a goal's running total and its latest rollups without touching progress_logs.
+
+    Args:
+        goal_id: Goal to report on
+        period: "day" or "week"
+        periods: Number of most recent periods with logs to return
+
+    Returns:
+        Optional[dict]: goal, current (this period's rollup or None) and
+        history rows, or None when the goal does not exist
+    """
+    async with use_read_session() as db:
+        goal = await db.get(Goal, goal_id)
+        if goal is None:
+            return None
+        repository = GoalProgressRepository(db)
+        starts = await repository.current_period_starts()
+        current = await repository.get_period(goal_id, period, getattr(starts, period))
+        history = await repository.get_rollups(goal_id, period, periods)
+    return {
+        "goal": goal,
+        "period_start": getattr(starts, period),
+        "current": current,
+        "history": history,
+    }
@@ -8,6 +8,8 @@ from app.ai.memory.base import BaseMemory
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SESSION_ID = "default_session"
+
 class MemoryService:
     """Service for managing chat memory operations."""
     
@@ -15,7 +17,7 @@ class MemoryService:
         self.memory_type = memory_type
         self.memory: Optional[BaseMemory] = None
 
-    async def setup_memory(self, db: Optional[AsyncSession] = None, session_id: str = "default_session") -> None:
+    async def setup_memory(self, db: Optional[AsyncSession] = None, session_id: str = DEFAULT_SESSION_ID) -> None:
         """
         Set up the initial memory instance.
         
@@ -35,8 +37,11 @@ class MemoryService:
                     raise ValueError("Database session required for remote memory")
                 self.memory = memory_factory(memory_type=self.memory_type, db=db, session_id=session_id)
                 logger.info("Remote memory initialized successfully")
+            elif self.memory_type == "redis":
+                self.memory = memory_factory(memory_type=self.memory_type, session_id=session_id)
+                logger.info("Redis memory initialized successfully")
             elif self.memory_type == "local":
-                self.memory = memory_factory(memory_type=self.memory_type)
+                self.memory = memory_factory(memory_type=self.memory_type, session_id=session_id)
                 logger.info("Local memory initialized successfully")
             else:
                 raise ValueError(f"Unsupported memory type: {self.memory_type}")
@@ -45,7 +50,7 @@ class MemoryService:
             logger.error(f"Failed to set up memory: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to initialize AI companion memory")
 
-    async def get_memory_instance(self, db: Optional[AsyncSession], session_id: str = "default_session") -> BaseMemory:
+    async def get_memory_instance(self, db: Optional[AsyncSession], session_id: str = DEFAULT_SESSION_ID) -> BaseMemory:
         """
         Get a memory instance for processing.
         
@@ -66,6 +71,10 @@ class MemoryService:
             if not db:
                 raise ValueError("Database session required for remote memory")
             return memory_factory(memory_type="remote", db=db, session_id=session_id)
+
+        if self.memory_type in ("redis", "local"):
+            from app.ai.memory import memory_factory
+            return memory_factory(memory_type=self.memory_type, session_id=session_id)
         
         if self.memory is None:
             logger.info("Memory not initialized, attempting initialization")
@@ -1,8 +1,6 @@
 import logging
 import os
 
-from app.db.database import get_db
-
 logger = logging.getLogger(__name__)
 
 async def send_scheduled_message(message: str) -> None:
@@ -22,9 +20,8 @@ async def send_scheduled_message(message: str) -> None:
                 }
             }
         }
-        async with get_db() as db:
-            from app.api.dependencies import \
-                chatbot_controller  # Import here to avoid circular dependency
-            await chatbot_controller.handle_webhook_data(payload, db)
+        from app.api.dependencies import \
+            chatbot_controller  # Import here to avoid circular dependency
+        await chatbot_controller.handle_webhook_data(payload)
     except Exception as e:
         logger.error(f"Error sending scheduled message: {str(e)}") 
\ No newline at end of file
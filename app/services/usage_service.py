@@ -0,0 +1,151 @@
+import os
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.tokens import estimate_tokens
+from app.core.turn_context import current_session_id, current_turn_id
+from app.db.buffered_writer import BufferedInsertWriter
+from app.db.models.ai_interaction import AIInteraction
+
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "5"))
+USAGE_FLUSH_BATCH = int(os.getenv("USAGE_FLUSH_BATCH", "50"))
+
+# USD per 1M tokens: (input, cached input, output). Transcription models are
+# billed per audio minute instead.
+MODEL_PRICING: Dict[str, tuple[Decimal, Decimal, Decimal]] = {
+    "o3-mini": (Decimal("1.10"), Decimal("0.55"), Decimal("4.40")),
+    "o4-mini": (Decimal("1.10"), Decimal("0.275"), Decimal("4.40")),
+    "gpt-4o": (Decimal("2.50"), Decimal("1.25"), Decimal("10.00")),
+    "gpt-4o-mini": (Decimal("0.15"), Decimal("0.075"), Decimal("0.60")),
+}
+TRANSCRIPTION_PRICING_PER_MINUTE: Dict[str, Decimal] = {
+    "whisper-1": Decimal("0.006"),
+}
+
+_SECTION_HEADER = re.compile(r"^\s*#{1,2}\s+(.+?)\s*$", re.MULTILINE)
+
+
+@lru_cache(maxsize=32)
+def _system_prompt_sections(system_prompt: str) -> tuple[tuple[str, int], ...]:
+    headers = list(_SECTION_HEADER.finditer(system_prompt))
+    if not headers:
+        return (("system", estimate_tokens(system_prompt)),)
+    sections = [("system", estimate_tokens(system_prompt[:headers[0].start()]))]
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(system_prompt)
+        name = header.group(1).strip("* ").lower()
+        sections.append((f"system:{name}", estimate_tokens(system_prompt[header.start():end])))
+    return tuple(sections)
+
+
+def prompt_sections(messages: List[Any]) -> Dict[str, int]:
+    """
+    Estimate how many prompt tokens each part of the prompt contributes.
+
+    System prompts are split on their markdown headings; the remaining messages
+    are grouped into conversation history, tool calls and tool results.
+
+    Args:
+        messages: Messages sent to the model
+
+    Returns:
+        Dict mapping section name to estimated token count
+    """
+    sections: Dict[str, int] = {}
+    for message in messages:
+        role = message.get("role")
+        content = str(message.get("content") or "")
+        if role == "system":
+            for name, tokens in _system_prompt_sections(content):
+                sections[name] = sections.get(name, 0) + tokens
+            continue
+        if role == "tool":
+            name = "tool_results"
+        elif message.get("tool_calls"):
+            name = "tool_calls"
+            content += str(message["tool_calls"])
+        else:
+            name = "history"
+        sections[name] = sections.get(name, 0) + estimate_tokens(content)
+    return sections
+
+
+def chat_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> Optional[Decimal]:
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    input_price, cached_price, output_price = pricing
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    total = uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price
+    return (total / Decimal(1_000_000)).quantize(Decimal("0.000001"))
+
+
+def transcription_cost(model: str, audio_seconds: Optional[float]) -> Optional[Decimal]:
+    price = TRANSCRIPTION_PRICING_PER_MINUTE.get(model)
+    if price is None or audio_seconds is None:
+        return None
+    return (Decimal(str(audio_seconds)) / 60 * price).quantize(Decimal("0.000001"))
+
+
+class UsageRecorder(BufferedInsertWriter):
+    """Buffered writer for per-call usage rows in ai_interactions."""
+
+    def __init__(self, flush_interval: float = USAGE_FLUSH_INTERVAL, batch_size: int = USAGE_FLUSH_BATCH):
+        super().__init__(AIInteraction, flush_interval, batch_size)
+
+    def record_chat_completion(
+        self,
+        model: str,
+        usage: Any,
+        latency: float,
+        iteration: int,
+        messages: List[Any],
+        tool_names: List[str],
+    ) -> None:
+        """Record the usage of one chat completion call."""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        prompt_details = getattr(usage, "prompt_tokens_details", None)
+        completion_details = getattr(usage, "completion_tokens_details", None)
+        cached_tokens = getattr(prompt_details, "cached_tokens", 0) or 0
+        reasoning_tokens = getattr(completion_details, "reasoning_tokens", 0) or 0
+        self.record({
+            "session_id": current_session_id.get(),
+            "turn_id": current_turn_id.get(),
+            "kind": "chat",
+            "model": model,
+            "iteration": iteration,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+            "reasoning_tokens": reasoning_tokens,
+            "audio_seconds": None,
+            "latency_ms": int(latency * 1000),
+            "tool_names": tool_names,
+            "prompt_sections": prompt_sections(messages),
+            "cost_usd": chat_cost(model, prompt_tokens, cached_tokens, completion_tokens),
+        })
+
+    def record_transcription(self, model: str, latency: float, audio_seconds: Optional[float]) -> None:
+        """Record the usage of one audio transcription call."""
+        self.record({
+            "session_id": current_session_id.get(),
+            "turn_id": current_turn_id.get(),
+            "kind": "transcription",
+            "model": model,
+            "iteration": None,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "reasoning_tokens": 0,
+            "audio_seconds": audio_seconds,
+            "latency_ms": int(latency * 1000),
+            "tool_names": None,
+            "prompt_sections": None,
+            "cost_usd": transcription_cost(model, audio_seconds),
+        })
+
+
+usage_recorder = UsageRecorder()
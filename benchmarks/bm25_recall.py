@@ -0,0 +1,64 @@
+"""
+Measure BM25 recall latency over a large synthetic chat history.
+
+Usage: python -m benchmarks.bm25_recall [--messages 100000] [--queries 200]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.ai.memory.lexical_index import BM25Index
+
+VOCABULARY_SIZE = 30_000
+
+
+def zipf_vocabulary(rng: random.Random):
+    """Word list and cumulative weights following Zipf's law, like natural text."""
+    words = [f"w{rank}" for rank in range(1, VOCABULARY_SIZE + 1)]
+    cumulative, total = [], 0.0
+    for rank in range(1, VOCABULARY_SIZE + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    return words, cumulative
+
+
+def synthetic_message(rng: random.Random, words, cumulative) -> str:
+    return " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(6, 30)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    words, cumulative = zipf_vocabulary(rng)
+    index = BM25Index()
+    started = time.perf_counter()
+    for doc_id in range(1, args.messages + 1):
+        index.add(doc_id, "user" if doc_id % 2 else "assistant", synthetic_message(rng, words, cumulative))
+    build_seconds = time.perf_counter() - started
+
+    queries = [synthetic_message(rng, words, cumulative) for _ in range(args.queries)]
+    recent = set(index.recent_ids(5))
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, args.top_k, exclude=recent)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f"indexed {len(index)} messages in {build_seconds:.2f}s")
+    print(
+        f"search over {len(queries)} queries: "
+        f"median {statistics.median(timings):.3f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms, "
+        f"max {timings[-1]:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Compare query plans on the hot query paths with and without their indexes.
+
+Seeds a scratch schema with realistic volumes, runs EXPLAIN ANALYZE for each
+query, creates the indexes declared on the models (the ones added by
+migration d7a3f0b2c615) and runs the queries again. Only the scratch schema is
+written to; it is dropped at the end unless --keep is given.
+
+Usage: python -m benchmarks.query_plans [--scale 1.0] [--runs 3] [--keep]
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.database import engine
+from app.db.models import ChatHistory, ProgressLog, Task
+
+SCHEMA = "bench_query_plans"
+TABLES = [ChatHistory.__table__, Task.__table__, ProgressLog.__table__]
+PRIMARY_KEYS = {"chat_history": "id", "tasks": "task_id", "progress_logs": "log_id"}
+
+QUERIES = [
+    ("chat window", """
+        SELECT id, message FROM chat_history
+        WHERE session_id = 'session-7' AND message ->> 'role' IN ('user', 'assistant')
+        ORDER BY id DESC LIMIT 5
+    """),
+    ("blocked tasks", "SELECT * FROM tasks WHERE status = 'blocked'"),
+    ("tasks of a project", "SELECT * FROM tasks WHERE project_id = 42"),
+    ("subtasks", "SELECT * FROM tasks WHERE parent_task_id = 1000"),
+    ("progress this week", """
+        SELECT * FROM progress_logs
+        WHERE created_at >= now() - interval '7 days'
+        ORDER BY created_at DESC
+    """),
+    ("progress of a task", "SELECT * FROM progress_logs WHERE related_task_id = 42"),
+    ("progress of a goal", "SELECT * FROM progress_logs WHERE related_goal_id = 17"),
+    ("progress of a project", "SELECT * FROM progress_logs WHERE related_project_id = 42"),
+]
+
+
+def seed_statements(scale: float) -> List[str]:
+    messages = int(500_000 * scale)
+    tasks = int(50_000 * scale)
+    logs = int(200_000 * scale)
+    # Explicit ids keep the copied serial defaults from drawing on the real sequences
+    return [
+        f"""
+        INSERT INTO chat_history (id, session_id, message, created_at)
+        SELECT g, 'session-' || (g % 200),
+               json_build_object(
+                   'role', CASE WHEN g % 7 = 0 THEN 'tool_log' WHEN g % 2 = 0 THEN 'user' ELSE 'assistant' END,
+                   'content', md5(g::text)
+               ),
+               now() - make_interval(secs => {messages} - g)
+        FROM generate_series(1, {messages}) g
+        """,
+        f"""
+        INSERT INTO tasks (task_id, project_id, title, status, priority, created_at, parent_task_id)
+        SELECT g, 1 + g % 500, 'task ' || g,
+               CASE WHEN g % 50 = 0 THEN 'blocked'
+                    WHEN g % 10 < 3 THEN 'todo'
+                    WHEN g % 10 < 5 THEN 'in_progress'
+                    ELSE 'completed' END,
+               (ARRAY['high', 'medium', 'low'])[1 + g % 3],
+               now() - make_interval(mins => g),
+               CASE WHEN g % 10 = 0 AND g > 10 THEN g - 5 END
+        FROM generate_series(1, {tasks}) g
+        """,
+        f"""
+        INSERT INTO progress_logs (log_id, log_type, related_task_id, related_goal_id, related_project_id,
+                                   value, description, created_at)
+        SELECT g,
+               (ARRAY['task_update', 'goal_progress', 'activity', 'focus_session'])[1 + g % 4],
+               CASE WHEN g % 3 = 0 THEN 1 + g % {tasks} END,
+               CASE WHEN g % 3 = 1 THEN 1 + g % 200 END,
+               CASE WHEN g % 3 = 2 THEN 1 + g % 500 END,
+               g % 100, md5(g::text),
+               now() - make_interval(mins => g)
+        FROM generate_series(1, {logs}) g
+        """,
+    ]
+
+
+async def analyze(conn: AsyncConnection) -> None:
+    for table in TABLES:
+        await conn.execute(text(f"ANALYZE {SCHEMA}.{table.name}"))
+
+
+async def create_schema(conn: AsyncConnection, scale: float) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    # public stays on the path for extension types, functions and operator classes
+    await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+    for table in TABLES:
+        await conn.execute(text(
+            f"CREATE TABLE {table.name} (LIKE public.{table.name} INCLUDING DEFAULTS)"
+        ))
+        await conn.execute(text(f"ALTER TABLE {table.name} ADD PRIMARY KEY ({PRIMARY_KEYS[table.name]})"))
+    for statement in seed_statements(scale):
+        await conn.execute(text(statement))
+    await analyze(conn)
+
+
+async def create_indexes(conn: AsyncConnection) -> None:
+    def create(sync_conn) -> None:
+        # Index names are unqualified, so they land in the schema on the search_path
+        for table in TABLES:
+            for index in table.indexes:
+                index.create(sync_conn)
+
+    await conn.run_sync(create)
+    await analyze(conn)
+
+
+def scan_nodes(plan: Dict[str, Any]) -> List[str]:
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        index = plan.get("Index Name")
+        nodes.append(f"{plan['Node Type']} ({index})" if index else plan["Node Type"])
+    for child in plan.get("Plans", []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+
+async def explain(conn: AsyncConnection, query: str, runs: int) -> Tuple[float, str]:
+    best: Optional[float] = None
+    plan: Dict[str, Any] = {}
+    for _ in range(runs):
+        raw = (await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"))).scalar()
+        result = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        if best is None or result["Execution Time"] < best:
+            best, plan = result["Execution Time"], result["Plan"]
+    return best, ", ".join(scan_nodes(plan))
+
+
+async def run_plans(conn: AsyncConnection, runs: int) -> Dict[str, Tuple[float, str]]:
+    return {name: await explain(conn, query, runs) for name, query in QUERIES}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on the seeded row counts")
+    parser.add_argument("--runs", type=int, default=3, help="EXPLAIN ANALYZE runs per query, best is kept")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch schema in place")
+    args = parser.parse_args()
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            await create_schema(conn, args.scale)
+            before = await run_plans(conn, args.runs)
+            await create_indexes(conn)
+            after = await run_plans(conn, args.runs)
+        finally:
+            await conn.execute(text("RESET search_path"))
+            if not args.keep:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    width = max(len(name) for name, _ in QUERIES)
+    print(f"{'query':<{width}}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}  plan before -> after")
+    for name, _ in QUERIES:
+        before_ms, before_plan = before[name]
+        after_ms, after_plan = after[name]
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"{name:<{width}}  {before_ms:>10.3f}  {after_ms:>10.3f}  {speedup:>7.1f}x  {before_plan} -> {after_plan}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
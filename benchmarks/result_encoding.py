@@ -0,0 +1,98 @@
+"""
+Compare the size and encoding time of SQL tool results: the old "Row i: k: v"
+rendering wrapped in json.dumps against the CSV encoder sent as is, first
+lossless and then with cells truncated as SQL_RESULT_MAX_CELL_CHARS would.
+
+Tokens are counted with tiktoken when it is installed and estimated at four
+characters per token otherwise.
+
+Usage: python -m benchmarks.result_encoding [--rows 200] [--repeat 200] [--max-cell-chars 300]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.ai.tools.result_encoder import encode_rows
+
+# Values the tasks table's CHECK constraints accept
+STATUSES = ("todo", "in_progress", "blocked", "completed")
+PRIORITIES = ("high", "medium", "low")
+WORDS = ("review", "draft", "call", "plan", "budget", "report", "follow", "up", "with", "team",
+         "client", "website", "invoice", "gym", "read", "chapter", "notes", "prepare", "slides")
+
+
+def synthetic_tasks(count: int, rng: random.Random):
+    """Rows shaped like SELECT * FROM tasks, as result.mappings().all() returns them."""
+    started = datetime(2025, 1, 6, 9, 30, 12, 345678)
+    rows = []
+    for task_id in range(1, count + 1):
+        created = started + timedelta(hours=rng.randint(0, 2000), microseconds=rng.randint(0, 999_999))
+        rows.append({
+            "task_id": task_id,
+            "project_id": rng.randint(1, 12),
+            "parent_task_id": rng.choice([None, None, rng.randint(1, task_id)]),
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 120))) or None,
+            "status": rng.choice(STATUSES),
+            "priority": rng.choice(PRIORITIES),
+            "due_date": rng.choice([None, datetime(2025, 3, rng.randint(1, 28))]),
+            "estimated_hours": Decimal(rng.randint(1, 40)) / 4,
+            "created_at": created,
+            "updated_at": created + timedelta(minutes=rng.randint(0, 600)),
+        })
+    return rows
+
+
+def legacy_format(rows) -> str:
+    """The SQL tool's previous rendering, kept here as the baseline."""
+    return "\n".join(
+        f"Row {i}: " + ", ".join(f"{k}: {v}" for k, v in row.items()) for i, row in enumerate(rows, 1)
+    )
+
+
+def token_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        return "estimate (4 chars/token)", lambda text: (len(text) + 3) // 4
+    encoding = tiktoken.get_encoding("o200k_base")
+    return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--max-cell-chars", type=int, default=300)
+    args = parser.parse_args()
+
+    rows = synthetic_tasks(args.rows, random.Random(42))
+    counter_name, count_tokens = token_counter()
+    variants = [
+        ("legacy", lambda: json.dumps(legacy_format(rows))),
+        ("csv", lambda: encode_rows(rows, max_chars=0)),
+        (f"csv, cells cut at {args.max_cell_chars}", lambda: encode_rows(rows, max_chars=args.max_cell_chars)),
+    ]
+
+    print(f"{args.rows} task rows, tokens counted with {counter_name}")
+    legacy_tokens = None
+    for name, encode in variants:
+        output = encode()
+        tokens = count_tokens(output)
+        legacy_tokens = legacy_tokens or tokens
+        print(f"{name:<24} {len(output):>8} chars {tokens:>7} tokens "
+              f"({1 - tokens / legacy_tokens:>6.1%} fewer) {timed(encode, args.repeat):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure query latency with and without the prepared statement cache.
+
+Runs the same parameterised queries through two single-connection engines
+built from the DB_* settings, one with DB_STATEMENT_CACHE_SIZE and one with
+caching disabled as it is behind pgbouncer. Only reads are issued.
+
+Usage: python -m benchmarks.statement_cache [--iterations 2000] [--cache-size 100]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from sqlalchemy import text
+
+from app.db.database import (DB_STATEMENT_CACHE_SIZE, behind_pgbouncer,
+                             build_engine, db_url)
+
+QUERIES = [
+    text("""
+        SELECT id, message FROM chat_history
+        WHERE session_id = :session_id AND message ->> 'role' IN ('user', 'assistant')
+        ORDER BY id DESC LIMIT 5
+    """),
+    text("""
+        SELECT t.task_id, t.title, t.status, p.name
+        FROM tasks t LEFT JOIN projects p ON p.project_id = t.project_id
+        WHERE t.status = :status AND (t.due_date IS NULL OR t.due_date > now())
+        ORDER BY t.due_date NULLS LAST LIMIT 20
+    """),
+]
+
+
+async def measure(cache_size: int, iterations: int) -> List[float]:
+    engine = build_engine(db_url, statement_cache_size=cache_size, pool_size=1, max_overflow=0)
+    timings = []
+    try:
+        async with engine.connect() as conn:
+            for i in range(iterations + 50):
+                started = time.perf_counter()
+                await conn.execute(QUERIES[0], {"session_id": f"session-{i % 10}"})
+                await conn.execute(QUERIES[1], {"status": "todo" if i % 2 else "in_progress"})
+                if i >= 50:  # first iterations only warm up the connection
+                    timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        await engine.dispose()
+    return timings
+
+
+def summary(timings: List[float]) -> str:
+    timings = sorted(timings)
+    return (
+        f"median {statistics.median(timings):.3f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms, "
+        f"mean {statistics.fmean(timings):.3f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--cache-size", type=int, default=DB_STATEMENT_CACHE_SIZE or 100)
+    args = parser.parse_args()
+
+    if behind_pgbouncer(db_url):
+        print("DB_URL goes through pgbouncer, so both runs have statement caching disabled")
+    uncached = await measure(0, args.iterations)
+    cached = await measure(args.cache_size, args.iterations)
+    print(f"{len(QUERIES)} queries per iteration, {args.iterations} iterations")
+    print(f"statement cache off: {summary(uncached)}")
+    print(f"statement cache {args.cache_size}: {summary(cached)}")
+    print(f"median speedup: {statistics.median(uncached) / statistics.median(cached):.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
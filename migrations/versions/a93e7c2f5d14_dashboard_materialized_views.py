@@ -0,0 +1,68 @@
+"""dashboard materialized views
+
+Revision ID: a93e7c2f5d14
+Revises: e8b2d5f0a913
+Create Date: 2026-10-19 19:26:48.661204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93e7c2f5d14'
+down_revision: Union[str, None] = 'e8b2d5f0a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, key column, defining query. Frozen as of this revision and must not
+# track DASHBOARD_VIEWS in app/db/repository/dashboard_repository.py;
+# changing a view there needs a migration that recreates it.
+VIEWS = [
+    ('dashboard_projects', 'project_id', """
+        SELECT p.project_id, p.name, p.status, p.priority, p.deadline,
+               count(t.task_id) FILTER (WHERE t.status = 'todo') AS todo,
+               count(t.task_id) FILTER (WHERE t.status = 'in_progress') AS in_progress,
+               count(t.task_id) FILTER (WHERE t.status = 'blocked') AS blocked,
+               count(t.task_id) FILTER (WHERE t.status = 'completed') AS completed,
+               count(t.task_id) AS total,
+               now() AS refreshed_at
+        FROM projects p
+        LEFT JOIN tasks t ON t.project_id = p.project_id
+        WHERE p.status IN ('planning', 'active', 'paused')
+        GROUP BY p.project_id
+    """),
+    ('dashboard_in_progress_tasks', 'task_id', """
+        SELECT t.task_id, t.title, t.project_id, t.priority, t.due_date, t.created_at,
+               max(l.created_at) AS last_progress_at,
+               now() AS refreshed_at
+        FROM tasks t
+        LEFT JOIN progress_logs l ON l.related_task_id = t.task_id
+        WHERE t.status = 'in_progress'
+        GROUP BY t.task_id
+    """),
+    ('dashboard_goals', 'goal_id', """
+        SELECT g.goal_id, g.title, g.goal_type, g.current_value, g.target_value, g.unit, g.deadline,
+               CASE WHEN g.target_value > 0
+                    THEN round(coalesce(g.current_value, 0) / g.target_value, 2)
+               END AS completion_ratio,
+               max(l.created_at) AS last_progress_at,
+               now() AS refreshed_at
+        FROM goals g
+        LEFT JOIN progress_logs l ON l.related_goal_id = g.goal_id
+        WHERE g.status = 'active'
+        GROUP BY g.goal_id
+    """),
+]
+
+
+def upgrade() -> None:
+    for name, key, query in VIEWS:
+        op.execute(f"CREATE MATERIALIZED VIEW {name} AS {query} WITH DATA")
+        # REFRESH ... CONCURRENTLY requires a unique index on the view
+        op.execute(f"CREATE UNIQUE INDEX ux_{name}_{key} ON {name} ({key})")
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(VIEWS):
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
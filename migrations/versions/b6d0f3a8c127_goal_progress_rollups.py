@@ -0,0 +1,137 @@
+"""goal progress rollups
+
+Revision ID: b6d0f3a8c127
+Revises: a93e7c2f5d14
+Create Date: 2026-10-19 21:08:15.942371
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d0f3a8c127'
+down_revision: Union[str, None] = 'a93e7c2f5d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The SQL below is frozen as of this revision and must not track
+# app/db/models/goal_progress_rollup.py; later changes to the trigger get
+# their own migration. Days and weeks are cut in the scheduler's timezone.
+ROLLUP_TIMEZONE = 'America/Sao_Paulo'
+
+APPLY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION apply_goal_progress(goal integer, logged_at timestamptz, amount numeric, delta integer)
+RETURNS void AS $$
+DECLARE
+    local_time timestamp := logged_at AT TIME ZONE '{ROLLUP_TIMEZONE}';
+BEGIN
+    INSERT INTO goal_progress_rollups AS r (goal_id, period, period_start, total, entries, last_logged_at)
+    VALUES (goal, 'day', local_time::date, coalesce(amount, 0), delta, logged_at),
+           (goal, 'week', date_trunc('week', local_time)::date, coalesce(amount, 0), delta, logged_at)
+    ON CONFLICT (goal_id, period, period_start) DO UPDATE
+        SET total = r.total + EXCLUDED.total,
+            entries = r.entries + EXCLUDED.entries,
+            -- Removals leave it alone; reconciliation corrects it
+            last_logged_at = CASE WHEN EXCLUDED.entries > 0
+                                  THEN greatest(r.last_logged_at, EXCLUDED.last_logged_at)
+                                  ELSE r.last_logged_at END;
+    -- A goal with valued logs has current_value = sum(value), as SYNC_CURRENT_VALUES sets it
+    IF amount IS NOT NULL THEN
+        UPDATE goals AS g SET current_value = totals.total
+        FROM (
+            SELECT sum(value) AS total FROM progress_logs
+            WHERE related_goal_id = goal AND value IS NOT NULL
+        ) AS totals
+        WHERE g.goal_id = goal AND totals.total IS NOT NULL
+          AND g.current_value IS DISTINCT FROM totals.total;
+    END IF;
+END
+$$ LANGUAGE plpgsql
+"""
+
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION progress_logs_goal_rollup()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.related_goal_id IS NOT NULL THEN
+        PERFORM apply_goal_progress(OLD.related_goal_id, OLD.created_at, -OLD.value, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.related_goal_id IS NOT NULL THEN
+        PERFORM apply_goal_progress(NEW.related_goal_id, NEW.created_at, NEW.value, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+BACKFILL = f"""
+INSERT INTO goal_progress_rollups (goal_id, period, period_start, total, entries, last_logged_at)
+SELECT related_goal_id, period, period_start, coalesce(sum(value), 0), count(*), max(created_at)
+FROM (
+    SELECT related_goal_id, value, created_at, 'day' AS period,
+           (created_at AT TIME ZONE '{ROLLUP_TIMEZONE}')::date AS period_start
+    FROM progress_logs WHERE related_goal_id IS NOT NULL
+    UNION ALL
+    SELECT related_goal_id, value, created_at, 'week',
+           date_trunc('week', created_at AT TIME ZONE '{ROLLUP_TIMEZONE}')::date
+    FROM progress_logs WHERE related_goal_id IS NOT NULL
+) AS logs
+GROUP BY related_goal_id, period, period_start
+"""
+
+# Goals without any valued log keep the current_value they were given by hand
+SYNC_CURRENT_VALUES = """
+UPDATE goals AS g SET current_value = totals.total
+FROM (
+    SELECT related_goal_id, sum(value) AS total
+    FROM progress_logs
+    WHERE related_goal_id IS NOT NULL AND value IS NOT NULL
+    GROUP BY related_goal_id
+) AS totals
+WHERE g.goal_id = totals.related_goal_id AND g.current_value IS DISTINCT FROM totals.total
+"""
+
+
+def upgrade() -> None:
+    # create_all runs on every boot and may already have built the table and
+    # installed the trigger, so each step only fills in what is missing
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('goal_progress_rollups'):
+        op.create_table('goal_progress_rollups',
+        sa.Column('goal_id', sa.Integer(), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('total', sa.Numeric(), server_default='0', nullable=False),
+        sa.Column('entries', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_logged_at', sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint("period IN ('day', 'week')"),
+        sa.ForeignKeyConstraint(['goal_id'], ['goals.goal_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('goal_id', 'period', 'period_start')
+        )
+    installed = bind.execute(sa.text(
+        "SELECT 1 FROM pg_trigger WHERE tgname = 'progress_logs_goal_rollup'"
+    )).scalar()
+    if installed:
+        # Functions and rollups went in with the trigger; keep those
+        return
+    op.execute(APPLY_FUNCTION)
+    op.execute(TRIGGER_FUNCTION)
+    # Block log writes while backfilling so no insert is counted twice or missed
+    op.execute("LOCK TABLE progress_logs IN SHARE MODE")
+    op.execute(
+        "CREATE TRIGGER progress_logs_goal_rollup "
+        "AFTER INSERT OR DELETE OR UPDATE OF related_goal_id, value, created_at ON progress_logs "
+        "FOR EACH ROW EXECUTE FUNCTION progress_logs_goal_rollup()"
+    )
+    op.execute("DELETE FROM goal_progress_rollups")
+    op.execute(BACKFILL)
+    op.execute(SYNC_CURRENT_VALUES)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS progress_logs_goal_rollup ON progress_logs")
+    op.execute("DROP FUNCTION IF EXISTS progress_logs_goal_rollup()")
+    op.execute("DROP FUNCTION IF EXISTS apply_goal_progress(integer, timestamptz, numeric, integer)")
+    op.drop_table('goal_progress_rollups')
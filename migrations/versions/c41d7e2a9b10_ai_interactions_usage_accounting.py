@@ -0,0 +1,52 @@
+"""ai_interactions usage accounting
+
+Revision ID: c41d7e2a9b10
+Revises: 1f6b3ced7385
+Create Date: 2026-10-19 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2a9b10'
+down_revision: Union[str, None] = '1f6b3ced7385'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('ai_interactions', 'message_text', existing_type=sa.TEXT(), nullable=True)
+    op.alter_column('ai_interactions', 'response_text', existing_type=sa.TEXT(), nullable=True)
+    op.add_column('ai_interactions', sa.Column('session_id', sa.String(length=100), nullable=True))
+    op.add_column('ai_interactions', sa.Column('turn_id', sa.String(length=64), nullable=True))
+    op.add_column('ai_interactions', sa.Column('kind', sa.String(length=20), server_default='chat', nullable=True))
+    op.add_column('ai_interactions', sa.Column('model', sa.String(length=50), nullable=True))
+    op.add_column('ai_interactions', sa.Column('iteration', sa.Integer(), nullable=True))
+    op.add_column('ai_interactions', sa.Column('prompt_tokens', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('ai_interactions', sa.Column('cached_tokens', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('ai_interactions', sa.Column('completion_tokens', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('ai_interactions', sa.Column('reasoning_tokens', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('ai_interactions', sa.Column('audio_seconds', sa.Numeric(), nullable=True))
+    op.add_column('ai_interactions', sa.Column('latency_ms', sa.Integer(), nullable=True))
+    op.add_column('ai_interactions', sa.Column('tool_names', sa.JSON(), nullable=True))
+    op.add_column('ai_interactions', sa.Column('prompt_sections', sa.JSON(), nullable=True))
+    op.add_column('ai_interactions', sa.Column('cost_usd', sa.Numeric(12, 6), nullable=True))
+    op.create_check_constraint(
+        'ai_interactions_kind_check', 'ai_interactions', "kind IN ('chat', 'transcription')"
+    )
+    op.create_index('ix_ai_interactions_session_created', 'ai_interactions', ['session_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_interactions_session_created', table_name='ai_interactions')
+    op.drop_constraint('ai_interactions_kind_check', 'ai_interactions', type_='check')
+    for column in ('cost_usd', 'prompt_sections', 'tool_names', 'latency_ms', 'audio_seconds',
+                   'reasoning_tokens', 'completion_tokens', 'cached_tokens', 'prompt_tokens',
+                   'iteration', 'model', 'kind', 'turn_id', 'session_id'):
+        op.drop_column('ai_interactions', column)
+    op.execute("DELETE FROM ai_interactions WHERE message_text IS NULL OR response_text IS NULL")
+    op.alter_column('ai_interactions', 'response_text', existing_type=sa.TEXT(), nullable=False)
+    op.alter_column('ai_interactions', 'message_text', existing_type=sa.TEXT(), nullable=False)
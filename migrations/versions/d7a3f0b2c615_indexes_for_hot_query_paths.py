@@ -0,0 +1,54 @@
+"""indexes for hot query paths
+
+Revision ID: d7a3f0b2c615
+Revises: c41d7e2a9b10
+Create Date: 2026-10-19 14:02:11.530947
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f0b2c615'
+down_revision: Union[str, None] = 'c41d7e2a9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_chat_history_session_id_id', 'chat_history', ['session_id', 'id']),
+    ('ix_tasks_status', 'tasks', ['status']),
+    ('ix_tasks_project_id', 'tasks', ['project_id']),
+    ('ix_tasks_parent_task_id', 'tasks', ['parent_task_id']),
+    ('ix_progress_logs_created_at', 'progress_logs', ['created_at']),
+    ('ix_progress_logs_related_task_id', 'progress_logs', ['related_task_id']),
+    ('ix_progress_logs_related_goal_id', 'progress_logs', ['related_goal_id']),
+    ('ix_progress_logs_related_project_id', 'progress_logs', ['related_project_id']),
+]
+
+
+def _drop_if_invalid(name: str, table: str) -> None:
+    """Drop the INVALID index an interrupted CREATE INDEX CONCURRENTLY leaves behind."""
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block. A run
+    # interrupted halfway can be retried: finished indexes are kept by
+    # if_not_exists and half-built ones are dropped and rebuilt.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _drop_if_invalid(name, table)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
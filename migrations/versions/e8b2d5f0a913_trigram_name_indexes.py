@@ -0,0 +1,69 @@
+"""trigram name indexes
+
+Revision ID: e8b2d5f0a913
+Revises: d7a3f0b2c615
+Create Date: 2026-10-19 17:41:03.208115
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2d5f0a913'
+down_revision: Union[str, None] = 'd7a3f0b2c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_tasks_title_trgm', 'tasks', 'title'),
+    ('ix_projects_name_trgm', 'projects', 'name'),
+    ('ix_goals_title_trgm', 'goals', 'title'),
+]
+
+
+def _drop_if_invalid(name: str, table: str) -> None:
+    """Drop the INVALID index an interrupted CREATE INDEX CONCURRENTLY leaves behind."""
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # Managed databases may refuse the extension; entity search then falls back
+    # to in-process matching, so skip the indexes rather than stop the chain
+    op.execute("""
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'pg_trgm could not be installed, skipping the trigram name indexes';
+    END $$
+    """)
+    installed = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).scalar()
+    if not installed:
+        return
+    # Retrying after an interruption keeps finished indexes and rebuilds half-built ones
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            _drop_if_invalid(name, table)
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    # pg_trgm stays installed; other objects may have come to depend on it
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
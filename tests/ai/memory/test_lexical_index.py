@@ -0,0 +1,31 @@
+from app.ai.memory.lexical_index import BM25Index
+
+
+def build_index(contents):
+    index = BM25Index()
+    for doc_id, content in enumerate(contents, start=1):
+        index.add(doc_id, "user", content)
+    return index
+
+
+def test_rare_terms_rank_first():
+    index = build_index(["buy milk", "call the dentist", "milk and bread", "pay rent"])
+
+    assert [doc_id for doc_id, _ in index.search("dentist appointment", k=2)] == [2]
+
+
+def test_query_of_only_common_terms_still_recalls():
+    # "meeting" is in every document, far above the document frequency cap
+    contents = [f"meeting note {i}" for i in range(200)] + ["meeting with the bank about the loan"]
+    index = build_index(contents)
+
+    assert index.search("meeting", k=3)
+    assert index.search("meeting loan", k=1)[0][0] == len(contents)
+
+
+def test_add_ignores_ids_already_indexed():
+    index = build_index(["buy milk"])
+    index.add(1, "user", "buy milk")
+
+    assert len(index) == 1
+    assert index.total_length == 2
@@ -0,0 +1,96 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from app.ai.memory.redis_memory import RedisMemory
+from app.db import buffered_writer
+from app.db.buffered_writer import BufferedInsertWriter
+from app.db.models.chat_history import ChatHistory
+
+
+class RecordingSession:
+    def __init__(self):
+        self.inserted = []
+        self.commits = 0
+
+    async def execute(self, statement, rows):
+        self.inserted.extend(rows)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+async def client():
+    client = FakeRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = RecordingSession()
+
+    @asynccontextmanager
+    async def get_db():
+        yield session
+
+    monkeypatch.setattr(buffered_writer, "get_db", get_db)
+    return session
+
+
+async def test_add_and_get_messages(client):
+    memory = RedisMemory("s1", client=client, window=5, archiver=None)
+    await memory.add_message("user", "hi")
+    await memory.add_message("assistant", "hello")
+
+    assert await memory.get_messages() == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    assert await client.ttl(memory.key) > 0
+
+
+async def test_tool_log_is_not_replayed(client):
+    memory = RedisMemory("s1", client=client, archiver=None)
+    await memory.add_messages([
+        {"role": "user", "content": "hi"},
+        {"role": "tool_log", "message": {"role": "tool", "content": "[]"}},
+        {"role": "assistant", "content": "hello"},
+    ])
+
+    assert [message["role"] for message in await memory.get_messages()] == ["user", "assistant"]
+
+
+async def test_list_is_trimmed_and_window_applied(client):
+    memory = RedisMemory("s1", client=client, window=3, max_messages=4, archiver=None)
+    await memory.add_messages([{"role": "user", "content": str(i)} for i in range(10)])
+
+    assert await client.llen(memory.key) == 4
+    assert [message["content"] for message in await memory.get_messages()] == ["7", "8", "9"]
+
+
+async def test_clear_messages(client):
+    memory = RedisMemory("s1", client=client, archiver=None)
+    await memory.add_message("user", "hi")
+    await memory.clear_messages()
+
+    assert await memory.get_messages() == []
+
+
+async def test_archive_flush_writes_every_message(client, session):
+    archiver = BufferedInsertWriter(ChatHistory, flush_interval=60, batch_size=100)
+    memory = RedisMemory("s1", client=client, archiver=archiver)
+    turn = [
+        {"role": "user", "content": "hi"},
+        {"role": "tool_log", "message": {"role": "tool", "content": "[]"}},
+        {"role": "assistant", "content": "hello"},
+    ]
+    await memory.add_messages(turn)
+    assert session.inserted == []
+
+    await archiver.stop()
+
+    assert session.inserted == [{"session_id": "s1", "message": message} for message in turn]
+    assert session.commits == 1
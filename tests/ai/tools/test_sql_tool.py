@@ -0,0 +1,159 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import app.db.models  # noqa: F401  registers the tables statements are parsed against
+from app.ai.tools import sql_tool
+from app.ai.tools.sql_tool import (_bounded_count_query, _limited_query,
+                                   _parse_statement, _process_data_values)
+
+
+def test_limited_query_survives_trailing_comment():
+    wrapped = _limited_query("SELECT * FROM tasks -- open ones;", 200)
+
+    assert wrapped.splitlines() == [
+        "SELECT * FROM (SELECT * FROM tasks -- open ones",
+        ") AS limited_query LIMIT 201",
+    ]
+
+
+def test_limited_query_leaves_writes_alone():
+    assert _limited_query("UPDATE tasks SET status = 'todo';", 200) == "UPDATE tasks SET status = 'todo'"
+
+
+def test_count_query_is_bounded():
+    counted = _bounded_count_query("SELECT * FROM tasks -- all", 1000)
+
+    assert counted.endswith(") AS counted_query LIMIT 1000) AS bounded")
+    assert "-- all\n)" in counted
+
+
+def test_parameters_are_coerced_for_their_column():
+    statement = _parse_statement("UPDATE tasks SET due_date = :d, title = :t WHERE task_id = :id", "UPDATE")
+
+    [values] = _process_data_values(statement, [{"d": "2025-03-01T10:00:00", "t": "x", "id": 1}])
+
+    assert values == {"d": datetime(2025, 3, 1, 10), "t": "x", "id": 1}
+
+
+def test_insert_values_map_to_the_column_list():
+    statement = _parse_statement(
+        "INSERT INTO tasks (title, due_date) VALUES (:name, :when)", "INSERT"
+    )
+
+    [values] = _process_data_values(statement, [{"name": "x", "when": "2025-03-01"}])
+
+    assert values["when"] == datetime(2025, 3, 1)
+
+
+def test_mismatched_parameters_are_rejected():
+    statement = _parse_statement("DELETE FROM tasks WHERE task_id = :id", "DELETE")
+
+    result = _process_data_values(statement, {"task_id": 1})
+
+    assert result["success"] is False
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+        self.returns_rows = rows is not None
+        self.rowcount = 1
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Records executed statements; fails the statement at index fail_at."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.executed = []
+        self.committed = []
+
+    async def execute(self, clause, parameters):
+        if len(self.executed) == self.fail_at:
+            raise IntegrityError(str(clause), parameters, Exception("violates foreign key constraint"))
+        self.executed.append((str(clause), parameters))
+        return FakeResult([{"task_id": 42}] if "RETURNING" in str(clause) else None)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+
+    @asynccontextmanager
+    async def use_session():
+        yield session
+
+    async def commit_writes(db, tables):
+        db.committed.append(set(tables))
+
+    monkeypatch.setattr(sql_tool, "use_session", use_session)
+    monkeypatch.setattr(sql_tool, "commit_writes", commit_writes)
+    return session
+
+
+async def test_batch_binds_each_statement_its_own_values(session):
+    result = await sql_tool.batch("plan", [
+        {"statement": "INSERT INTO tasks (title, due_date) VALUES (:t, :d) RETURNING task_id",
+         "values": {"t": "Write report", "d": "2025-03-01"}},
+        {"statement": "UPDATE tasks SET due_date = :d WHERE task_id = :id",
+         "values": {"d": "2025-03-02T09:00:00", "id": "$0.task_id"}},
+    ])
+
+    assert result["success"] is True
+    assert [r["rowcount"] for r in result["results"]] == [1, 1]
+    assert result["results"][0]["returning"] == [{"task_id": 42}]
+    assert [parameters for _, parameters in session.executed] == [
+        {"t": "Write report", "d": datetime(2025, 3, 1)},
+        {"d": datetime(2025, 3, 2, 9), "id": 42},
+    ]
+    assert session.committed == [{"tasks"}]
+
+
+async def test_batch_failure_applies_nothing(session):
+    session.fail_at = 1
+
+    result = await sql_tool.batch("plan", [
+        {"statement": "DELETE FROM tasks WHERE task_id = :id", "values": {"id": 1}},
+        {"statement": "DELETE FROM projects WHERE project_id = :id", "values": {"id": 2}},
+        {"statement": "DELETE FROM goals WHERE goal_id = :id", "values": {"id": 3}},
+    ])
+
+    assert result["success"] is False
+    assert result["failed_statement"] == 1
+    assert len(session.executed) == 1
+    assert session.committed == []
+
+
+async def test_batch_rejects_mismatched_values_before_later_statements(session):
+    result = await sql_tool.batch("plan", [
+        {"statement": "DELETE FROM tasks WHERE task_id = :id", "values": {"id": 1}},
+        {"statement": "DELETE FROM tasks WHERE task_id = :id", "values": {"task_id": 2}},
+        {"statement": "DELETE FROM tasks WHERE task_id = :id", "values": {"id": 3}},
+    ])
+
+    assert result["success"] is False
+    assert result["failed_statement"] == 1
+    assert "missing: id" in result["message"]
+    assert len(session.executed) == 1
+    assert session.committed == []
+
+
+async def test_batch_reference_needs_returning(session):
+    result = await sql_tool.batch("plan", [
+        {"statement": "INSERT INTO tasks (title) VALUES (:t)", "values": {"t": "x"}},
+        {"statement": "DELETE FROM tasks WHERE task_id = :id", "values": {"id": "$0.task_id"}},
+    ])
+
+    assert result["success"] is False
+    assert result["failed_statement"] == 1
+    assert "RETURNING task_id" in result["message"]
+    assert session.committed == []
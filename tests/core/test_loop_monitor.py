@@ -0,0 +1,26 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_monitor import BlockingCallError, LoopLagMonitor
+
+
+@pytest.mark.allow_loop_blocking
+async def test_blocking_turn_raises():
+    monitor = LoopLagMonitor(interval=0.01)
+    try:
+        with pytest.raises(BlockingCallError):
+            async with monitor.track_turn("blocking"):
+                time.sleep(0.4)
+    finally:
+        await monitor.stop()
+
+
+async def test_awaiting_turn_passes():
+    monitor = LoopLagMonitor(interval=0.01)
+    try:
+        async with monitor.track_turn("awaiting"):
+            await asyncio.sleep(0.2)
+    finally:
+        await monitor.stop()
@@ -0,0 +1,51 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db import buffered_writer
+from app.db.buffered_writer import BufferedInsertWriter
+from app.db.models.chat_history import ChatHistory
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    rows = []
+
+    class Session:
+        async def execute(self, statement, batch):
+            rows.extend(batch)
+
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def get_db():
+        yield Session()
+
+    monkeypatch.setattr(buffered_writer, "get_db", get_db)
+    return rows
+
+
+async def test_batch_size_triggers_flush(inserted):
+    writer = BufferedInsertWriter(ChatHistory, flush_interval=60, batch_size=2)
+    writer.record_many([{"session_id": "s", "message": {}}] * 2)
+    await asyncio.sleep(0.01)
+
+    assert len(inserted) == 2
+    await writer.stop()
+
+
+async def test_ended_flusher_is_restarted(inserted):
+    writer = BufferedInsertWriter(ChatHistory, flush_interval=60, batch_size=1)
+    writer.record({"session_id": "s", "message": {}})
+    writer._task.cancel()
+    await asyncio.sleep(0.01)
+    assert writer._task.done()
+
+    writer.record({"session_id": "s", "message": {}})
+    await asyncio.sleep(0.01)
+
+    assert not writer._task.done()
+    assert len(inserted) == 2
+    await writer.stop()
@@ -0,0 +1,37 @@
+import app.db.models  # noqa: F401  registers the tables referenced_tables looks up
+from app.db.query_cache import QueryResultCache, normalize_sql, referenced_tables
+
+
+def tables_of(sql):
+    return referenced_tables(normalize_sql(sql))
+
+
+def test_tables_are_collected():
+    assert tables_of("SELECT * FROM Tasks t JOIN projects p USING (project_id)") == {"tasks", "projects"}
+
+
+def test_clock_dependent_queries_are_not_cached():
+    assert tables_of("SELECT * FROM tasks WHERE due_date < now()") is None
+    assert tables_of("SELECT * FROM tasks WHERE due_date::date = 'today'::date") is None
+    assert tables_of("SELECT * FROM tasks WHERE created_at > 'Now'::timestamp") is None
+    assert tables_of("SELECT age(created_at) FROM tasks") is None
+
+
+def test_literals_do_not_look_like_tables_or_clocks():
+    assert tables_of("SELECT * FROM tasks WHERE title = 'goals for today''s now()'") == {"tasks"}
+
+
+def test_background_written_tables_are_not_cached():
+    assert tables_of("SELECT count(*) FROM chat_history") is None
+    assert tables_of("SELECT * FROM ai_interactions JOIN tasks ON true") is None
+
+
+def test_write_invalidates_entries_and_derived_tables():
+    cache = QueryResultCache(mode="process")
+    goals = frozenset({"goals"})
+    cache.put("q", "result", goals, cache.generations(goals))
+    assert cache.get("q") == "result"
+
+    cache.invalidate("progress_logs")
+
+    assert cache.get("q") is None